@@ -0,0 +1,234 @@
+"""Массовое создание и изменение произведений.
+
+Элементы без id создаются, элементы с id изменяют существующие
+произведения. Все slug жанров и категорий проверяются одним запросом
+на таблицу, произведения и связи с жанрами записываются через
+bulk_create/bulk_update в одной транзакции. Если хотя бы один элемент
+содержит ошибки, ничего не сохраняется.
+"""
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from api_yamdb.search_utils import normalize_search_text
+from reviews.models import Category, Genre, Title
+from reviews.search import index_titles
+from reviews.signals import bump_version_on_commit
+from reviews.versions import CATALOG
+
+TITLE_FIELDS = ('name', 'year', 'description')
+
+
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Проверяет один элемент без запросов к БД.
+
+    Slug жанров и категории проверяются позже для всех элементов сразу.
+    """
+
+    id = serializers.IntegerField(required=False)
+    category = serializers.SlugField()
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False,
+    )
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'year', 'category', 'genre', 'description')
+
+    def validate(self, attrs):
+        if 'id' not in attrs:
+            missing = {
+                field: 'Обязательное поле.'
+                for field in ('category', 'genre') if field not in attrs
+            }
+            if missing:
+                raise serializers.ValidationError(missing)
+        return attrs
+
+
+def validate_items(data):
+    """Возвращает проверенные данные и ошибки каждого элемента."""
+    if not isinstance(data, list):
+        raise serializers.ValidationError(
+            'Ожидается список произведений.'
+        )
+    if len(data) > settings.BULK_TITLES_MAX_SIZE:
+        raise serializers.ValidationError(
+            f'За один запрос можно передать не больше '
+            f'{settings.BULK_TITLES_MAX_SIZE} произведений.'
+        )
+    items, errors = [], []
+    for item in data:
+        serializer = TitleBulkItemSerializer(data=item, partial=True)
+        if serializer.is_valid():
+            items.append(dict(serializer.validated_data))
+            errors.append({})
+        else:
+            items.append(None)
+            errors.append(serializer.errors)
+    return items, errors
+
+
+def resolve_items(items, errors):
+    """Заменяет slug на id и находит произведения для изменения.
+
+    Для каждой таблицы выполняется один запрос.
+    """
+    valid = [item for item in items if item is not None]
+    genre_ids = dict(Genre.objects.filter(
+        slug__in={slug for item in valid for slug in item.get('genre', ())}
+    ).order_by().values_list('slug', 'id'))
+    category_ids = dict(Category.objects.filter(
+        slug__in={item['category'] for item in valid if 'category' in item}
+    ).order_by().values_list('slug', 'id'))
+    titles = Title.objects.in_bulk(
+        [item['id'] for item in valid if 'id' in item]
+    )
+    seen_ids = set()
+    for item, item_errors in zip(items, errors):
+        if item is None:
+            continue
+        if 'id' in item:
+            if item['id'] not in titles:
+                item_errors['id'] = ['Произведение не найдено.']
+            elif item['id'] in seen_ids:
+                item_errors['id'] = ['Произведение указано несколько раз.']
+            seen_ids.add(item['id'])
+        unknown = [
+            slug for slug in item.get('genre', ()) if slug not in genre_ids
+        ]
+        if unknown:
+            item_errors['genre'] = [
+                f'Жанр {slug} не найден.' for slug in unknown
+            ]
+        if 'category' in item and item['category'] not in category_ids:
+            item_errors['category'] = ['Категория не найдена.']
+    return genre_ids, category_ids, titles
+
+
+def check_unique_names(errors, instances):
+    """Проверяет уникальность пары (название, категория) одним запросом."""
+    pairs = {}
+    for index, instance in instances.items():
+        if instance.category_id is None:
+            # NULL в уникальном ограничении не совпадает с другими NULL.
+            continue
+        pairs.setdefault((instance.name, instance.category_id), []).append(
+            index
+        )
+    existing = Title.objects.filter(
+        name__in={name for name, _ in pairs}
+    ).order_by().values_list('name', 'category_id', 'id')
+    taken = {(name, category_id): pk for name, category_id, pk in existing}
+    for pair, indexes in pairs.items():
+        owner = taken.get(pair)
+        for index in indexes:
+            if len(indexes) > 1 or owner not in (None, instances[index].pk):
+                errors[index].setdefault('name', []).append(
+                    'Произведение с таким названием уже есть в категории.'
+                )
+
+
+def build_instances(items, errors, category_ids, titles):
+    """Создает или изменяет объекты Title без сохранения."""
+    instances = {}
+    for index, item in enumerate(items):
+        if item is None or errors[index]:
+            continue
+        title = titles[item['id']] if 'id' in item else Title()
+        for field in TITLE_FIELDS:
+            if field in item:
+                setattr(title, field, item[field])
+        if 'category' in item:
+            title.category_id = category_ids[item['category']]
+        title.name_search = normalize_search_text(title.name)
+        instances[index] = title
+    return instances
+
+
+def write_titles(instances, genre_slugs, genre_ids):
+    """Сохраняет произведения и их жанры в одной транзакции."""
+    created = [title for title in instances.values() if title.pk is None]
+    updated = [title for title in instances.values() if title.pk is not None]
+    replaced_ids = [
+        instances[index].pk for index in genre_slugs
+        if instances[index].pk is not None
+    ]
+    through = Title.genre.through
+    with transaction.atomic():
+        Title.objects.bulk_create(created)
+        if created and created[0].pk is None:
+            # SQLite не возвращает id из bulk_create: новые произведения
+            # находятся по уникальной паре (название, категория).
+            ids = {
+                (name, category_id): pk
+                for name, category_id, pk in Title.objects.filter(
+                    name__in={title.name for title in created}
+                ).order_by().values_list('name', 'category_id', 'id')
+            }
+            for title in created:
+                title.pk = ids[title.name, title.category_id]
+        Title.objects.bulk_update(
+            updated, TITLE_FIELDS + ('category', 'name_search')
+        )
+        through.objects.filter(title_id__in=replaced_ids).delete()
+        through.objects.bulk_create([
+            through(title_id=instances[index].pk, genre_id=genre_ids[slug])
+            for index, slugs in genre_slugs.items()
+            for slug in slugs
+        ])
+        index_titles(list(instances.values()))
+        bump_version_on_commit(CATALOG)
+
+
+def represent_titles(instances, genre_slugs, category_ids):
+    """Данные ответа в формате TitleCreateSerializer.
+
+    Запросы нужны только для жанров и категорий, которые не передавались.
+    """
+    kept_slugs = {}
+    for title_id, slug in Title.genre.through.objects.filter(title_id__in=[
+        instance.pk for index, instance in instances.items()
+        if index not in genre_slugs
+    ]).order_by('id').values_list('title_id', 'genre__slug'):
+        kept_slugs.setdefault(title_id, []).append(slug)
+    category_slugs = {pk: slug for slug, pk in category_ids.items()}
+    missing = {
+        title.category_id for title in instances.values()
+    } - set(category_slugs) - {None}
+    if missing:
+        category_slugs.update(Category.objects.filter(
+            id__in=missing
+        ).order_by().values_list('id', 'slug'))
+    return [
+        {
+            'id': title.pk,
+            'name': title.name,
+            'year': title.year,
+            'category': category_slugs.get(title.category_id),
+            'genre': genre_slugs.get(index, kept_slugs.get(title.pk, [])),
+            'description': title.description,
+        }
+        for index, title in instances.items()
+    ]
+
+
+def save_titles(data):
+    """Создает и изменяет произведения.
+
+    Возвращает пару (произведения, ошибки); произведения сохраняются,
+    только если ни у одного элемента нет ошибок.
+    """
+    items, errors = validate_items(data)
+    genre_ids, category_ids, titles = resolve_items(items, errors)
+    instances = build_instances(items, errors, category_ids, titles)
+    check_unique_names(errors, instances)
+    if any(errors):
+        return None, errors
+    genre_slugs = {
+        index: list(dict.fromkeys(items[index]['genre']))
+        for index in instances if 'genre' in items[index]
+    }
+    write_titles(instances, genre_slugs, genre_ids)
+    return represent_titles(instances, genre_slugs, category_ids), errors
@@ -0,0 +1,47 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+CachedResponse = namedtuple('CachedResponse', ('content', 'content_type'))
+
+
+class ResponseCache:
+    """LRU-кэш отрендеренных ответов с ограничением по памяти.
+
+    Размер записи считается по длине тела ответа. При превышении
+    max_bytes вытесняются записи, которые дольше всего не запрашивались.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        size = len(entry.content)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.content)
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
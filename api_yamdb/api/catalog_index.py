@@ -0,0 +1,121 @@
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+from reviews.models import Category, Genre, Title
+from reviews.versions import CATALOG, get_versions
+
+
+def make_bitset(ids):
+    """Собирает битовое множество из id: бит i установлен для id == i."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for id_ in ids:
+        bits[id_ >> 3] |= 1 << (id_ & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitset_ids(bitset):
+    """Возвращает отсортированный список id битового множества."""
+    ids = []
+    data = bitset.to_bytes((bitset.bit_length() + 7) // 8, 'little')
+    for index, byte in enumerate(data):
+        while byte:
+            low = byte & -byte
+            ids.append(index * 8 + low.bit_length() - 1)
+            byte ^= low
+    return ids
+
+
+class CatalogIndex:
+    """Битовые множества id произведений по жанрам, категориям и годам.
+
+    Индекс хранится в памяти процесса и перестраивается при первом
+    обращении после смены версии каталога. Пересечение и объединение
+    множеств заменяют соединения с таблицей связей жанров.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.genres = {}
+        self.categories = {}
+        self.years = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        version = get_versions(CATALOG)
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:
+                self.build()
+                self.version = version
+
+    def build(self):
+        genre_slugs = dict(Genre.objects.order_by().values_list('id', 'slug'))
+        category_slugs = dict(
+            Category.objects.order_by().values_list('id', 'slug')
+        )
+        genres = defaultdict(list)
+        title_genres = Title.genre.through.objects.values_list(
+            'genre_id', 'title_id'
+        )
+        for genre_id, title_id in title_genres.iterator():
+            genres[genre_slugs[genre_id]].append(title_id)
+        categories = defaultdict(list)
+        years = defaultdict(list)
+        titles = Title.objects.order_by().values_list(
+            'id', 'category_id', 'year'
+        )
+        for title_id, category_id, year in titles.iterator():
+            if category_id is not None:
+                categories[category_slugs[category_id]].append(title_id)
+            if year is not None:
+                years[year].append(title_id)
+        self.genres = {
+            slug: make_bitset(ids) for slug, ids in genres.items()
+        }
+        self.categories = {
+            slug: make_bitset(ids) for slug, ids in categories.items()
+        }
+        self.years = {year: make_bitset(ids) for year, ids in years.items()}
+
+    def match(self, genres=None, genre_mode='any', categories=None,
+              year=None):
+        """Возвращает id подходящих произведений.
+
+        Пустое значение фильтра не ограничивает выборку. Если под фильтры
+        подходит больше CATALOG_INDEX_MAX_IDS произведений, возвращает
+        None: такой список выгоднее отбирать запросом к БД.
+        """
+        if not genres and not categories and year is None:
+            return None
+        self.refresh()
+        result = None
+        if genres:
+            sets = [self.genres.get(slug, 0) for slug in genres]
+            result = sets[0]
+            for bitset in sets[1:]:
+                if genre_mode == 'all':
+                    result &= bitset
+                else:
+                    result |= bitset
+        if categories:
+            bitset = 0
+            for slug in categories:
+                bitset |= self.categories.get(slug, 0)
+            result = bitset if result is None else result & bitset
+        if year is not None:
+            bitset = self.years.get(year, 0)
+            result = bitset if result is None else result & bitset
+        if result is None:
+            return None
+        if bin(result).count('1') > settings.CATALOG_INDEX_MAX_IDS:
+            return None
+        return bitset_ids(result)
+
+
+catalog_index = CatalogIndex()
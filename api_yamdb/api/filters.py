@@ -1,24 +1,203 @@
+from django.db.models import Count, F
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter, SearchFilter
 
-from reviews.models import Title
+from api_yamdb.search_utils import normalize_search_text
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles
+from .catalog_index import catalog_index
+
+
+class NormalizedSearchFilter(SearchFilter):
+    """Поиск по нормализованным полям *_search.
+
+    Строка поиска приводится к тому же виду, что и значения полей.
+    Префикс ^ в search_fields включает поиск по префиксу, который
+    использует индекс, = — точное совпадение, без префикса — вхождение.
+    Параметр запроса search_mode=prefix ищет по префиксу и в полях без
+    префикса.
+    """
+
+    lookup_prefixes = {
+        '^': 'prefix',
+        '=': 'exact',
+    }
+    search_mode_param = 'search_mode'
+    prefix_mode = False
+
+    def filter_queryset(self, request, queryset, view):
+        self.prefix_mode = (
+            request.query_params.get(self.search_mode_param) == 'prefix'
+        )
+        return super().filter_queryset(request, queryset, view)
+
+    def get_search_terms(self, request):
+        return [
+            normalize_search_text(term)
+            for term in super().get_search_terms(request)
+        ]
+
+    def construct_search(self, field_name):
+        lookup = self.lookup_prefixes.get(field_name[0])
+        if lookup:
+            field_name = field_name[1:]
+        elif self.prefix_mode:
+            lookup = 'prefix'
+        else:
+            lookup = 'contains'
+        return f'{field_name}__{lookup}'
+
+
+class AliasOrderingFilter(OrderingFilter):
+    """Сортировка по сохраненным и индексированным полям.
+
+    ordering_aliases — имя в параметре ordering и поле модели. Последним
+    полем сортировки всегда добавляется id, чтобы порядок был
+    однозначным и для навигации по курсору. Поля из nulls_last_aliases
+    выводят NULL в конце при любом направлении.
+    """
+
+    ordering_aliases = {}
+    nulls_last_aliases = ()
+
+    def get_valid_fields(self, queryset, view, context={}):
+        return [(alias, alias) for alias in self.ordering_aliases]
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [self.get_term(term) for term in ordering] + ['id']
+
+    def get_term(self, term):
+        alias = term.lstrip('-')
+        field = self.ordering_aliases[alias]
+        if term.startswith('-'):
+            # При убывании SQLite и так выводит NULL в конце, а простая
+            # сортировка по полю использует его индекс.
+            return f'-{field}'
+        if alias in self.nulls_last_aliases:
+            return F(field).asc(nulls_last=True)
+        return field
+
+
+class TitleOrderingFilter(AliasOrderingFilter):
+    """Сортировка произведений."""
+
+    ordering_aliases = {
+        'rating': 'rating_avg',
+        'weighted_rating': 'rating_weighted',
+        'year': 'year',
+        'reviews_count': 'rating_count',
+    }
+    # У произведений без оценок рейтинг NULL, они выводятся последними.
+    nulls_last_aliases = ('rating', 'weighted_rating')
+
+
+class ReviewOrderingFilter(AliasOrderingFilter):
+    """Сортировка отзывов произведения."""
+
+    ordering_aliases = {
+        'pub_date': 'pub_date',
+        'score': 'score',
+        'comments_count': 'comments_count',
+    }
 
 
 class TitlesFilter(filters.FilterSet):
     """Фильтр для произведений."""
 
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='contains'
+    name = filters.CharFilter(method='filter_name')
+    name_mode = filters.ChoiceFilter(
+        choices=(('contains', 'contains'), ('prefix', 'prefix')),
+        method='filter_name_mode'
     )
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='contains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='contains'
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=(('any', 'any'), ('all', 'all')),
+        method='filter_genre_mode'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'genre', 'category']
+        fields = [
+            'name', 'name_mode', 'year', 'genre', 'genre_mode', 'category',
+            'search',
+        ]
+
+    index_fields = ('genre', 'genre_mode', 'category', 'year')
+
+    def filter_queryset(self, queryset):
+        """Отбирает произведения по жанрам, категориям и году в индексе.
+
+        Остальные фильтры и слишком большие выборки обрабатываются БД.
+        """
+        data = self.form.cleaned_data
+        ids = catalog_index.match(
+            genres=self.parse_slugs(data.get('genre') or ''),
+            genre_mode=data.get('genre_mode') or 'any',
+            categories=self.parse_slugs(data.get('category') or ''),
+            year=data.get('year'),
+        )
+        skip = ()
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+            skip = self.index_fields
+        for name, value in data.items():
+            if name not in skip:
+                queryset = self.filters[name].filter(queryset, value)
+        return queryset
+
+    @staticmethod
+    def parse_slugs(value):
+        return {slug.strip() for slug in value.split(',') if slug.strip()}
+
+    def filter_category(self, queryset, name, value):
+        category_ids = list(Category.objects.filter(
+            slug__in=self.parse_slugs(value)
+        ).values_list('id', flat=True))
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_genre(self, queryset, name, value):
+        """Фильтрует по списку slug жанров через запятую.
+
+        При genre_mode=all произведение должно относиться ко всем жанрам,
+        по умолчанию — хотя бы к одному.
+        """
+        slugs = self.parse_slugs(value)
+        genre_ids = list(Genre.objects.filter(
+            slug__in=slugs
+        ).values_list('id', flat=True))
+        title_genres = Title.genre.through.objects.filter(
+            genre_id__in=genre_ids
+        )
+        if self.form.cleaned_data.get('genre_mode') == 'all':
+            if len(genre_ids) < len(slugs):
+                return queryset.none()
+            title_genres = title_genres.values('title_id').annotate(
+                genres_count=Count('genre_id')
+            ).filter(genres_count=len(genre_ids))
+        return queryset.filter(id__in=title_genres.values('title_id'))
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+    def filter_name(self, queryset, name, value):
+        """Ищет по вхождению в название, при name_mode=prefix — по началу
+        названия с использованием индекса."""
+        lookup = 'contains'
+        if self.form.cleaned_data.get('name_mode') == 'prefix':
+            lookup = 'prefix'
+        return queryset.filter(**{
+            f'name_search__{lookup}': normalize_search_text(value)
+        })
+
+    def filter_name_mode(self, queryset, name, value):
+        # Режим учитывается в filter_name.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
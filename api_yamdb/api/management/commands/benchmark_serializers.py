@@ -0,0 +1,128 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import (CategorySerializer, CommentSerializer,
+                             GenreSerializer, ReviewSerializer,
+                             TitleSerializer)
+from api.values_serializers import (CommentValuesSerializer,
+                                    NameSlugValuesSerializer,
+                                    ReviewValuesSerializer,
+                                    TitleValuesSerializer)
+from reviews.models import Category, Comment, Genre, Review, Title
+
+ENDPOINTS = {
+    'categories': (
+        lambda: Category.objects.all(),
+        CategorySerializer,
+        NameSlugValuesSerializer,
+    ),
+    'genres': (
+        lambda: Genre.objects.all(),
+        GenreSerializer,
+        NameSlugValuesSerializer,
+    ),
+    'titles': (
+        lambda: Title.objects.select_related('category').prefetch_related(
+            'genre'
+        ).order_by('name'),
+        TitleSerializer,
+        TitleValuesSerializer,
+    ),
+    'reviews': (
+        lambda: Review.objects.select_related('author', 'title'),
+        ReviewSerializer,
+        ReviewValuesSerializer,
+    ),
+    'comments': (
+        lambda: Comment.objects.select_related('author'),
+        CommentSerializer,
+        CommentValuesSerializer,
+    ),
+}
+
+
+class Command(BaseCommand):
+    """Сравнивает скорость построения списков сериализаторами DRF
+    и быстрыми сериализаторами из строк .values() на данных из БД.
+
+    Для каждого списка выводится число объектов в секунду и ускорение,
+    время включает запросы к БД и рендеринг JSON.
+    Пример запуска команды:
+    python manage.py benchmark_serializers --rows 100 --repeat 50
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100,
+            help='Количество объектов в списке'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество повторов для каждого списка'
+        )
+        parser.add_argument(
+            'endpoints',
+            nargs='*',
+            help=f'Списки для проверки: {", ".join(ENDPOINTS)}; '
+                 f'по умолчанию все'
+        )
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError(
+                'Количество объектов и повторов должно быть больше 0'
+            )
+        unknown = set(options['endpoints']) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные списки: {", ".join(sorted(unknown))}'
+            )
+        for name in options['endpoints'] or ENDPOINTS:
+            self.benchmark(name, rows, repeat)
+
+    def benchmark(self, name, rows, repeat):
+        get_queryset, serializer_class, values_class = ENDPOINTS[name]
+        # Поля по умолчанию, как в ответе без параметров запроса.
+        optional = getattr(serializer_class.Meta, 'optional_fields', ())
+        field_names = [
+            name for name in serializer_class().fields
+            if name not in optional
+        ]
+        renderer = JSONRenderer()
+
+        def serialize():
+            serializer = serializer_class(get_queryset()[:rows], many=True)
+            for name in optional:
+                serializer.child.fields.pop(name)
+            return renderer.render(serializer.data)
+
+        def serialize_values():
+            serializer = values_class(field_names)
+            return renderer.render(serializer.to_representation(
+                serializer.values(get_queryset())[:rows]
+            ))
+
+        if serialize() != serialize_values():
+            raise CommandError(f'{name}: ответы различаются')
+        count = len(get_queryset()[:rows])
+        slow = self.measure(serialize, repeat)
+        fast = self.measure(serialize_values, repeat)
+        self.stdout.write(
+            f'{name}: объектов {count}, '
+            f'DRF {count * repeat / slow:.0f}/с, '
+            f'values {count * repeat / fast:.0f}/с, '
+            f'ускорение {slow / fast:.1f}x'
+        )
+
+    def measure(self, function, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return time.perf_counter() - start
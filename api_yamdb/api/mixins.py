@@ -1,4 +1,27 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, urlencode
 from rest_framework import mixins, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from reviews.versions import get_last_modified, get_versions
+from .cache import CachedResponse
+from .pagination import parse_ordering
+
+
+def normalized_query(request):
+    """Строка запроса с упорядоченными параметрами и значениями."""
+    return urlencode(sorted(
+        (param, sorted(values))
+        for param, values in request.query_params.lists()
+    ), doseq=True)
 
 
 class ListCreateDestroyViewSet(mixins.CreateModelMixin,
@@ -8,3 +31,231 @@ class ListCreateDestroyViewSet(mixins.CreateModelMixin,
     """Mixin обрабатывает создание, удаление и получение списка объектов."""
 
     pass
+
+
+class ListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Mixin обрабатывает только получение списка объектов."""
+
+    pass
+
+
+class CachedResponseMixin:
+    """Mixin кэширует ответы list и retrieve до смены версий данных.
+
+    Ключ кэша строится из пути, нормализованной строки запроса и текущих
+    версий из cache_versions, поэтому изменение данных делает старые
+    записи недоступными за O(1). Кэшируются только JSON-ответы.
+    """
+
+    response_cache = None
+    cache_versions = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request):
+        return (
+            request.path,
+            normalized_query(request),
+            request.accepted_media_type,
+            get_versions(*self.cache_versions),
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return HttpResponse(
+                cached.content, content_type=cached.content_type
+            )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            self.response_cache_key = key
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        key = getattr(self, 'response_cache_key', None)
+        if key is not None:
+            response.render()
+            self.response_cache.set(key, CachedResponse(
+                response.content, response['Content-Type']
+            ))
+        return response
+
+
+class ConditionalListMixin:
+    """Mixin поддерживает условные GET-запросы к списку объектов.
+
+    ETag строится из пути, строки запроса и версий данных из cache_versions,
+    Last-Modified — время последнего изменения этих данных. Если клиент
+    прислал совпадающий If-None-Match или не более старый
+    If-Modified-Since, возвращается 304 без обращения к БД и сериализации.
+
+    Last-Modified точен до секунды, поэтому пока не закончилась секунда
+    последнего изменения, он не отдается и If-Modified-Since не
+    учитывается: иначе следующее изменение в ту же секунду не изменило бы
+    заголовок и клиент получил бы устаревший ответ 304.
+    """
+
+    cache_versions = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def get_etag_key(self, request):
+        return (
+            request.path,
+            normalized_query(request),
+            request.accepted_media_type,
+            get_versions(*self.cache_versions),
+        )
+
+    def get_etag(self, request):
+        key = self.get_etag_key(request)
+        return '"{}"'.format(hashlib.md5(repr(key).encode()).hexdigest())
+
+    def get_conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        last_modified = int(get_last_modified(*self.cache_versions))
+        if last_modified >= int(time.time()):
+            last_modified = None
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalGetMixin(ConditionalListMixin):
+    """Mixin поддерживает условные GET-запросы к списку и объекту."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+def related_paths(select_related, prefix=''):
+    """Пути select_related из дерева query.select_related."""
+    for name, nested in select_related.items():
+        if nested:
+            yield from related_paths(nested, f'{prefix}{name}__')
+        else:
+            yield f'{prefix}{name}'
+
+
+def prune_queryset(queryset, serializer, keep=()):
+    """Загружает только колонки и связи, нужные полям сериализатора.
+
+    keep — поля модели, которые нужны независимо от сериализатора. Если
+    поле сериализатора зависит от неизвестных полей модели, запрос
+    не меняется.
+    """
+    model = queryset.model
+    field_sources = getattr(serializer.Meta, 'field_sources', {})
+    columns = {model._meta.pk.name, *keep}
+    relations = set()
+    for name, field in serializer.fields.items():
+        for source in field_sources.get(name, (field.source,)):
+            root = source.split('.')[0]
+            try:
+                model_field = model._meta.get_field(root)
+            except FieldDoesNotExist:
+                return queryset
+            if model_field.is_relation:
+                relations.add(root)
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(root)
+    select_related = queryset.query.select_related
+    if isinstance(select_related, dict):
+        queryset = queryset.select_related(None)
+        kept = [
+            path for path in related_paths(select_related)
+            if path.split('__')[0] in relations
+        ]
+        if kept:
+            queryset = queryset.select_related(*kept)
+    prefetches = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if (lookup.prefetch_through if isinstance(lookup, Prefetch)
+            else lookup).split('__')[0] in relations
+    ]
+    return queryset.prefetch_related(None).prefetch_related(
+        *prefetches
+    ).only(*columns)
+
+
+class SparseFieldsViewMixin:
+    """Mixin откладывает загрузку колонок и связей, не нужных полям ответа.
+
+    Работает вместе с SparseFieldsSerializerMixin сериализатора: при запросе
+    ?fields= или ?exclude= из БД читаются только поля, от которых зависят
+    оставшиеся поля сериализатора, и поля сортировки по курсору.
+    """
+
+    def filter_queryset(self, queryset):
+        # filter_queryset, а не get_queryset: представления отзывов
+        # и комментариев переопределяют get_queryset.
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        if (self.request.method not in SAFE_METHODS
+                or not ({'fields', 'exclude'} & set(params))):
+            return queryset
+        keep = [
+            parse_ordering(term)[0]
+            for term in getattr(self, 'keyset_ordering', ())
+        ]
+        return prune_queryset(queryset, self.get_serializer(), keep)
+
+
+class ValuesListMixin:
+    """Mixin строит список через values_serializer_class, минуя создание
+    объектов моделей и ModelSerializer.
+
+    Поля ответа берутся из обычного сериализатора представления. Если
+    какое-то поле быстрый сериализатор не поддерживает или быстрый путь
+    выключен настройкой FAST_READ_SERIALIZERS, список строится как обычно.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        values_serializer_class = self.values_serializer_class
+        field_names = list(self.get_serializer().fields)
+        if (not settings.FAST_READ_SERIALIZERS
+                or values_serializer_class is None
+                or not values_serializer_class.supports(field_names)):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        keyset_columns = [
+            queryset.model._meta.get_field(parse_ordering(term)[0]).attname
+            for term in getattr(self, 'keyset_ordering', ())
+        ]
+        serializer = values_serializer_class(field_names, keyset_columns)
+        queryset = serializer.values(queryset)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(queryset))
@@ -0,0 +1,166 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.db.models.expressions import OrderBy
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, PageNumberPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def parse_ordering(term):
+    """Поле, направление и положение NULL элемента сортировки.
+
+    Элемент — имя поля с необязательным минусом или OrderBy. Без явного
+    nulls_first/nulls_last NULL считается меньше любого значения, как
+    в SQLite.
+    """
+    if isinstance(term, OrderBy):
+        nulls_last = term.descending
+        if term.nulls_first or term.nulls_last:
+            nulls_last = bool(term.nulls_last)
+        return term.expression.name, term.descending, nulls_last
+    descending = term.startswith('-')
+    return term.lstrip('-'), descending, descending
+
+
+class KeysetPagination(BasePagination):
+    """Навигация по курсору из значений ключа сортировки и id.
+
+    Порядок задается атрибутом keyset_ordering представления, последним
+    полем в нем должен быть уникальный id. Следующая страница выбирается
+    условием по значениям последнего объекта, а не OFFSET, поэтому любая
+    страница обходится так же дешево, как первая. Поля сортировки могут
+    содержать NULL.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.MAX_PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = view.keyset_ordering
+        self.keys = [parse_ordering(term) for term in self.ordering]
+        self.fields = [
+            queryset.model._meta.get_field(name) for name, _, _ in self.keys
+        ]
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(position))
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_position_filter(self, position):
+        """Условие (a, b, ...) > (va, vb, ...) с учетом направлений и NULL.
+
+        NULL не сравнивается с другими значениями, поэтому для него
+        условия строятся через isnull: после NULL идут непустые значения,
+        если NULL в начале, и ничего, если в конце.
+        """
+        condition = Q()
+        equal = Q()
+        for (field, descending, nulls_last), value in zip(
+            self.keys, position
+        ):
+            if value is None:
+                if not nulls_last:
+                    condition |= equal & Q(**{f'{field}__isnull': False})
+                equal &= Q(**{f'{field}__isnull': True})
+                continue
+            lookup = 'lt' if descending else 'gt'
+            after = Q(**{f'{field}__{lookup}': value})
+            if nulls_last:
+                after |= Q(**{f'{field}__isnull': True})
+            condition |= equal & after
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_position(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field.attname] for field in self.fields]
+        return [getattr(obj, field.attname) for field in self.fields]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in position
+        ]
+        encoded = urlsafe_b64encode(
+            json.dumps(values, ensure_ascii=False).encode('utf-8')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """Навигация по номеру страницы, а при параметре cursor — по курсору.
+
+    Пустой cursor запрашивает первую страницу в режиме курсора.
+    """
+
+    page_size_query_param = 'page_size'
+    max_page_size = settings.MAX_PAGE_SIZE
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
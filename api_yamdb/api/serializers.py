@@ -1,14 +1,72 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.generics import get_object_or_404
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.models import (SCORES, Category, Comment, Genre, Title, Review,
+                            score_count_field)
 from users.models import User
 
 
+def split_param(params, name):
+    return {value for value in params.get(name, '').split(',') if value}
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в ответе на GET-запрос поля из параметра fields
+    и убирает поля из exclude, например ?fields=id,name,rating.
+
+    Поля из Meta.optional_fields выводятся, только если они перечислены
+    в fields или include. Вложенные данные из Meta.expandable включаются
+    параметром expand (?expand=reviews,reviews.comments), только при
+    запросе одного объекта. Meta.field_sources задает поля модели, от которых
+    зависит поле сериализатора, если оно не совпадает с полем модели;
+    по ним представление откладывает загрузку ненужных колонок.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        params = request.query_params
+        fields = split_param(params, 'fields')
+        exclude = split_param(params, 'exclude')
+        optional = set(getattr(self.Meta, 'optional_fields', ()))
+        unknown = (fields | exclude) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            })
+        expand = split_param(params, 'expand')
+        self.validate_expand(expand)
+        expandable = {
+            path.split('.')[0] for path in getattr(self.Meta, 'expandable', ())
+        }
+        expanded = {path.split('.')[0] for path in expand}
+        included = fields | split_param(params, 'include')
+        hidden = exclude | (optional - (included - expandable) - expanded)
+        if fields:
+            hidden |= set(self.fields) - fields - expanded
+        for field in hidden:
+            self.fields.pop(field)
+
+    def validate_expand(self, expand):
+        if not expand:
+            return
+        unknown = expand - set(getattr(self.Meta, 'expandable', ()))
+        if unknown:
+            raise serializers.ValidationError({
+                'expand': f'Неизвестные значения: {", ".join(sorted(unknown))}'
+            })
+        if getattr(self.context.get('view'), 'action', None) != 'retrieve':
+            raise serializers.ValidationError({
+                'expand': 'Параметр доступен только для одного объекта'
+            })
+
+
 class TokenObtainSerializer(TokenObtainPairSerializer):
     """Сериализатор получения токена."""
 
@@ -47,7 +105,7 @@ class CreateUserSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     """Сериализатор модели User."""
 
     class Meta:
@@ -85,7 +143,8 @@ class UserMeSerializer(UserSerializer):
         model = User
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор модели Category."""
 
     class Meta:
@@ -93,7 +152,8 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериализатор модели Genre."""
 
     class Meta:
@@ -101,15 +161,23 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериализатор модели Title."""
 
-    rating = serializers.IntegerField(
-        source='reviews__score__avg',
+    rating = serializers.IntegerField(read_only=True)
+    weighted_rating = serializers.FloatField(read_only=True)
+    reviews_count = serializers.IntegerField(
+        source='rating_count',
         read_only=True,
     )
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
+    score_distribution = serializers.DictField(
+        child=serializers.IntegerField(),
+        read_only=True,
+    )
+    reviews = serializers.SerializerMethodField()
 
     class Meta:
         fields = (
@@ -117,17 +185,38 @@ class TitleSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'weighted_rating',
+            'reviews_count',
             'category',
             'genre',
             'description',
+            'score_distribution',
+            'reviews',
         )
+        optional_fields = ('score_distribution', 'reviews')
+        expandable = ('reviews', 'reviews.comments')
+        field_sources = {
+            'rating': ('rating_avg',),
+            'weighted_rating': ('rating_weighted',),
+            'score_distribution': tuple(
+                score_count_field(score) for score in SCORES
+            ),
+            'reviews': ('id',),
+        }
         model = Title
 
-    def get_rating(self, title):
-        rating = title.reviews.aggregate(Avg('score')).get('score__avg')
-        if not rating:
-            return None
-        return round(rating, 1)
+    def get_reviews(self, title):
+        """Первые отзывы, загруженные представлением в expanded_reviews,
+        с первыми комментариями из expanded_comments."""
+        reviews = []
+        for review in getattr(title, 'expanded_reviews', ()):
+            data = ReviewSerializer(review).data
+            if hasattr(review, 'expanded_comments'):
+                data['comments'] = CommentSerializer(
+                    review.expanded_comments, many=True
+                ).data
+            reviews.append(data)
+        return reviews
 
 
 class TitleCreateSerializer(serializers.ModelSerializer):
@@ -148,7 +237,8 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'category', 'genre', 'description')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор модели Review."""
 
     title = serializers.SlugRelatedField(
@@ -164,19 +254,9 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = '__all__'
         model = Review
 
-    def validate(self, data):
-        request = self.context.get('request')
-        queryset = self.context.get('view').get_queryset()
-        if request.method == 'PATCH':
-            return data
-        if queryset.filter(author=request.user).exists():
-            raise serializers.ValidationError(
-                'Нельзя оставлять больше 1 отзыва на произведение'
-            )
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор модели Comment."""
 
     author = serializers.SlugRelatedField(
@@ -187,3 +267,33 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
+
+
+class RecentReviewSerializer(ReviewSerializer):
+    """Отзыв в лентах последних отзывов, с id произведения."""
+
+    title_id = serializers.IntegerField(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = (
+            'id', 'title_id', 'title', 'text', 'author', 'score', 'pub_date',
+            'comments_count',
+        )
+
+
+class RecentCommentSerializer(CommentSerializer):
+    """Комментарий в лентах последних комментариев, с отзывом
+    и произведением."""
+
+    title_id = serializers.IntegerField(
+        source='review.title_id',
+        read_only=True,
+    )
+    title = serializers.CharField(source='review.title.name', read_only=True)
+    review_id = serializers.IntegerField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = (
+            'id', 'title_id', 'title', 'review_id', 'text', 'author',
+            'pub_date',
+        )
@@ -5,16 +5,38 @@ from .views import (CommentViewSet,
                     ReviewViewSet,
                     CategoryViewSet,
                     GenreViewSet,
+                    RecentCommentViewSet,
+                    RecentReviewViewSet,
                     TitleViewSet,
+                    UserCommentViewSet,
+                    UserReviewViewSet,
                     UserViewSet,
                     TokenObtainView,
-                    register_user)
+                    export_catalog,
+                    register_user,
+                    signup_stats)
 
 router_v1 = DefaultRouter()
 router_v1.register(r"users", UserViewSet, basename="users")
+router_v1.register(
+    r'users/(?P<username>[^/.]+)/reviews',
+    UserReviewViewSet,
+    basename='user-reviews'
+)
+router_v1.register(
+    r'users/(?P<username>[^/.]+)/comments',
+    UserCommentViewSet,
+    basename='user-comments'
+)
 router_v1.register(r'categories', CategoryViewSet, basename="categories")
 router_v1.register(r'genres', GenreViewSet, basename="genres")
 router_v1.register(r'titles', TitleViewSet, basename="titles")
+router_v1.register(
+    r'reviews/recent', RecentReviewViewSet, basename='recent-reviews'
+)
+router_v1.register(
+    r'comments/recent', RecentCommentViewSet, basename='recent-comments'
+)
 router_v1.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet,
@@ -29,6 +51,8 @@ router_v1.register(
 urlpatterns = [
     path('', include(router_v1.urls)),
     path('auth/signup/', register_user, name='registration'),
+    path('auth/signup/stats/', signup_stats, name='signup-stats'),
+    path('export/', export_catalog, name='export'),
     path('auth/token/',
          TokenObtainView.as_view(),
          name='token_obtain_pair', ),
@@ -0,0 +1,156 @@
+"""Быстрое чтение списков из строк .values().
+
+Для списков не создаются объекты моделей и сериализаторы DRF: каждому
+полю ответа заранее сопоставлены колонки запроса и функция, строящая
+значение из строки. Результат совпадает с ответом сериализаторов из
+serializers.py байт в байт, набор и порядок полей берется из них же,
+поэтому работают и параметры fields/exclude.
+"""
+from collections import namedtuple
+
+from rest_framework import serializers
+
+from reviews.models import SCORES, Title, score_count_field
+
+Mapper = namedtuple('Mapper', ('columns', 'to_representation'))
+
+DATETIME_FIELD = serializers.DateTimeField()
+
+
+def column(name, convert=None):
+    """Поле из одной колонки; None выводится как None, как в DRF."""
+
+    def to_representation(row):
+        value = row[name]
+        if value is None or convert is None:
+            return value
+        return convert(value)
+
+    return Mapper((name,), to_representation)
+
+
+def nested(prefix, names):
+    """Вложенный объект из колонок связанной модели или None."""
+    columns = tuple(f'{prefix}__{name}' for name in names)
+
+    def to_representation(row):
+        if row[columns[-1]] is None:
+            return None
+        return {name: row[key] for name, key in zip(names, columns)}
+
+    return Mapper(columns, to_representation)
+
+
+def score_distribution(row):
+    return {str(score): row[score_count_field(score)] for score in SCORES}
+
+
+class ValuesSerializer:
+    """Строит ответ для списка по именам полей сериализатора DRF.
+
+    mappers — поле ответа и его Mapper. Строки запрашиваются методом
+    values(), затем to_representation превращает их в данные ответа.
+    """
+
+    mappers = {}
+
+    def __init__(self, field_names, extra_columns=()):
+        self.mappers = [(name, self.mappers[name]) for name in field_names]
+        columns = [
+            name for _, mapper in self.mappers for name in mapper.columns
+        ]
+        self.columns = list(dict.fromkeys(columns + list(extra_columns)))
+
+    @classmethod
+    def supports(cls, field_names):
+        return set(field_names) <= set(cls.mappers)
+
+    def values(self, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(
+            *self.columns
+        )
+
+    def to_representation(self, rows):
+        return [
+            {name: mapper.to_representation(row)
+             for name, mapper in self.mappers}
+            for row in rows
+        ]
+
+
+class NameSlugValuesSerializer(ValuesSerializer):
+    mappers = {
+        'name': column('name'),
+        'slug': column('slug'),
+    }
+
+
+class TitleValuesSerializer(ValuesSerializer):
+    mappers = {
+        'id': column('id'),
+        'name': column('name'),
+        'year': column('year', int),
+        'rating': column('rating_avg', int),
+        'weighted_rating': column('rating_weighted', float),
+        'reviews_count': column('rating_count'),
+        'category': nested('category', ('name', 'slug')),
+        'genre': Mapper(('id',), lambda row: row['genre']),
+        'description': column('description'),
+        'score_distribution': Mapper(
+            tuple(score_count_field(score) for score in SCORES),
+            score_distribution,
+        ),
+    }
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        if any(name == 'genre' for name, _ in self.mappers):
+            # Один запрос на все жанры страницы в порядке сортировки жанров,
+            # как при prefetch_related('genre').
+            genres = {row['id']: [] for row in rows}
+            for title_id, name, slug in Title.genre.through.objects.filter(
+                title_id__in=genres
+            ).order_by('genre__name').values_list(
+                'title_id', 'genre__name', 'genre__slug'
+            ):
+                genres[title_id].append({'name': name, 'slug': slug})
+            for row in rows:
+                row['genre'] = genres[row['id']]
+        return super().to_representation(rows)
+
+
+class ReviewValuesSerializer(ValuesSerializer):
+    mappers = {
+        'id': column('id'),
+        'title': column('title__name'),
+        'author': column('author__username'),
+        'text': column('text'),
+        'score': column('score', int),
+        'pub_date': column('pub_date', DATETIME_FIELD.to_representation),
+        'comments_count': column('comments_count'),
+    }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    mappers = {
+        'id': column('id'),
+        'text': column('text'),
+        'author': column('author__username'),
+        'pub_date': column('pub_date', DATETIME_FIELD.to_representation),
+    }
+
+
+class RecentReviewValuesSerializer(ValuesSerializer):
+    mappers = {
+        **ReviewValuesSerializer.mappers,
+        'title_id': column('title_id'),
+    }
+
+
+class RecentCommentValuesSerializer(ValuesSerializer):
+    mappers = {
+        **CommentValuesSerializer.mappers,
+        'title_id': column('review__title_id'),
+        'title': column('review__title__name'),
+        'review_id': column('review_id'),
+    }
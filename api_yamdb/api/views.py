@@ -1,79 +1,153 @@
+from collections.abc import Mapping
+
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import api_view, action
+from rest_framework.decorators import (action, api_view,
+                                       permission_classes)
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from reviews.models import Category, Genre, Title, Review
+from reviews.export import export_lines, gzip_stream, join_stream
+from reviews.models import Category, Comment, Genre, Title, Review
+from reviews.top import ALL, category_scope, genre_scope, get_top
+from reviews.versions import CATALOG, COMMENTS, REVIEWS, USERNAMES, USERS
 from users.models import User
-from .filters import TitlesFilter
-from .mixins import ListCreateDestroyViewSet
+from users.outbox import enqueue_email
+from users.signups import (get_signup_stats, is_recent_signup,
+                           remember_signup)
+from .bulk import save_titles
+from .cache import ResponseCache
+from .filters import (NormalizedSearchFilter, ReviewOrderingFilter,
+                      TitleOrderingFilter, TitlesFilter)
+from .mixins import (CachedResponseMixin, ConditionalGetMixin,
+                     ConditionalListMixin, ListCreateDestroyViewSet,
+                     ListViewSet, SparseFieldsViewMixin, ValuesListMixin)
+from .pagination import KeysetPagination, PageNumberOrKeysetPagination
+from .parsers import NDJSONParser
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrStaff
 from .serializers import (CategorySerializer,
                           CommentSerializer,
                           CreateUserSerializer,
                           GenreSerializer,
+                          RecentCommentSerializer,
+                          RecentReviewSerializer,
                           ReviewSerializer,
                           TitleCreateSerializer,
                           TitleSerializer,
                           TokenObtainSerializer,
                           UserSerializer,
                           UserMeSerializer,
+                          split_param,
                           )
+from .values_serializers import (CommentValuesSerializer,
+                                 NameSlugValuesSerializer,
+                                 RecentCommentValuesSerializer,
+                                 RecentReviewValuesSerializer,
+                                 ReviewValuesSerializer,
+                                 TitleValuesSerializer)
 
 
 def send_registration_mail(user, token):
-    send_mail(
+    # Письмо отправит команда send_outbox_emails после фиксации транзакции.
+    enqueue_email(
         subject='Регистрация на YaMDb',
         message=(
             f'{user.username}, ваш код подтверждения для получения токена: '
             f'{token}'
         ),
-        from_email=None,
-        recipient_list=[user.email],
-        fail_silently=False,
+        recipient=user.email,
     )
 
 
 @api_view(['POST'])
 def register_user(request):
-    """Регистрация нового пользователя."""
-
+    """Регистрация нового пользователя.
+
+    Повтор с теми же username и email в течение SIGNUP_RESEND_WINDOW
+    секунд получает тот же ответ без запросов к БД и без нового письма.
+    """
+    username = email = None
+    if isinstance(request.data, Mapping):
+        username = request.data.get('username')
+        email = request.data.get('email')
+    # Остальные запросы проверяет сериализатор.
+    remember = isinstance(username, str) and isinstance(email, str)
+    if remember and is_recent_signup(username, email):
+        return Response(request.data, status=status.HTTP_200_OK)
     serializer = CreateUserSerializer(data=request.data)
     try:
-        user = User.objects.get(
-            username=request.data['username'],
-            email=request.data['email'],
-        )
+        user = User.objects.get(username=username, email=email)
     except Exception:
         user = None
-    if not user:
-        serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-    token = default_token_generator.make_token(user)
-    send_registration_mail(user, token)
+    with transaction.atomic():
+        if not user:
+            serializer.is_valid(raise_exception=True)
+            user = serializer.save()
+        token = default_token_generator.make_token(user)
+        send_registration_mail(user, token)
+        if remember:
+            transaction.on_commit(lambda: remember_signup(username, email))
     return Response(request.data, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def signup_stats(request):
+    """Счетчики отправленных и подавленных писем при регистрации."""
+    return Response(get_signup_stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_catalog(request):
+    """Потоковая выгрузка произведений, отзывов и комментариев в NDJSON.
+
+    Если клиент принимает gzip (Accept-Encoding), ответ сжимается.
+    """
+    lines = export_lines(settings.EXPORT_CHUNK_SIZE)
+    compress = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    response = StreamingHttpResponse(
+        gzip_stream(lines) if compress else join_stream(lines),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    response['Content-Disposition'] = 'attachment; filename="yamdb.ndjson"'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
 class TokenObtainView(TokenObtainPairView):
     """Получения токена."""
 
     serializer_class = TokenObtainSerializer
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, SparseFieldsViewMixin,
+                  viewsets.ModelViewSet):
     """Представление для модели User."""
 
     serializer_class = UserSerializer
-    filter_backends = (filters.SearchFilter, filters.OrderingFilter)
+    filter_backends = (NormalizedSearchFilter, filters.OrderingFilter)
     permission_classes = (IsAdmin,)
     lookup_field = 'username'
     queryset = User.objects.all()
-    search_fields = ('username',)
+    search_fields = ('username_search',)
     ordering = ('username',)
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('username', 'id')
+    cache_versions = (USERS,)
 
     @action(
         detail=False,
@@ -91,82 +165,316 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+class CategoryViewSet(ConditionalListMixin, SparseFieldsViewMixin,
+                      ValuesListMixin, ListCreateDestroyViewSet):
     """Представление для модели Category."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    values_serializer_class = NameSlugValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('name_search',)
     lookup_field = 'slug'
+    cache_versions = (CATALOG,)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(ConditionalListMixin, SparseFieldsViewMixin,
+                   ValuesListMixin, ListCreateDestroyViewSet):
     """Представление для модели Genre."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    values_serializer_class = NameSlugValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('name_search',)
     lookup_field = 'slug'
+    cache_versions = (CATALOG,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin,
+                   SparseFieldsViewMixin, ValuesListMixin,
+                   viewsets.ModelViewSet):
     """Представление для модели Title."""
 
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
     ).order_by('name')
     serializer_class = TitleSerializer
+    values_serializer_class = TitleValuesSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    filter_backends = (DjangoFilterBackend, TitleOrderingFilter)
     filterset_class = TitlesFilter
+    response_cache = ResponseCache(settings.TITLES_CACHE_MAX_BYTES)
+    pagination_class = PageNumberOrKeysetPagination
+
+    @property
+    def cache_versions(self):
+        if 'expand' in self.request.query_params:
+            # Во вложенных отзывах выводятся комментарии и имена авторов.
+            return (CATALOG, REVIEWS, COMMENTS, USERNAMES)
+        return (CATALOG, REVIEWS)
+
+    @property
+    def keyset_ordering(self):
+        ordering = TitleOrderingFilter().get_ordering(
+            self.request, self.queryset, self
+        )
+        return ordering or ('name', 'id')
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH'):
             return TitleCreateSerializer
         return TitleSerializer
 
+    def get_object(self):
+        title = super().get_object()
+        if self.action == 'retrieve':
+            self.expand_reviews(
+                title, split_param(self.request.query_params, 'expand')
+            )
+        return title
+
+    def expand_reviews(self, title, expand):
+        """Загружает первые отзывы произведения и первые комментарии
+        к ним для ?expand=reviews,reviews.comments.
+
+        Отзывы и комментарии загружаются двумя запросами независимо
+        от их количества.
+        """
+        if 'reviews' not in expand and 'reviews.comments' not in expand:
+            return
+        title.expanded_reviews = list(
+            title.reviews.select_related('author')
+            .order_by('id')[:settings.EXPANDED_REVIEWS_SIZE]
+        )
+        if 'reviews.comments' not in expand:
+            return
+        first_comments = Comment.objects.filter(
+            review=OuterRef('review')
+        ).order_by('id').values('id')[:settings.EXPANDED_COMMENTS_SIZE]
+        comments = Comment.objects.filter(
+            review__in=title.expanded_reviews,
+            id__in=Subquery(first_comments),
+        ).select_related('author').order_by('id')
+        by_review = {review.id: [] for review in title.expanded_reviews}
+        for comment in comments:
+            by_review[comment.review_id].append(comment)
+        for review in title.expanded_reviews:
+            review.expanded_comments = by_review[review.id]
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие произведения по рейтингу, в том числе в категории
+        или жанре."""
+        category = request.query_params.get('category')
+        genre = request.query_params.get('genre')
+        if category and genre:
+            raise ValidationError(
+                'Укажите либо категорию, либо жанр, но не оба сразу'
+            )
+        scope = ALL
+        if category:
+            scope = category_scope(
+                get_object_or_404(Category, slug=category).id
+            )
+        elif genre:
+            scope = genre_scope(get_object_or_404(Genre, slug=genre).id)
+        title_ids = get_top(scope)
+        titles = self.get_queryset().in_bulk(title_ids)
+        serializer = self.get_serializer(
+            [titles[title_id] for title_id in title_ids
+             if title_id in titles],
+            many=True
+        )
+        return Response(serializer.data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(
+        detail=False,
+        methods=('post',),
+        permission_classes=(IsAdmin,),
+        parser_classes=(JSONParser, NDJSONParser),
+    )
+    def bulk(self, request):
+        """Создание и изменение списка произведений одним запросом."""
+        titles, errors = save_titles(request.data)
+        if titles is None:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(titles, status=status.HTTP_201_CREATED)
+
+
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsViewMixin,
+                    ValuesListMixin, viewsets.ModelViewSet):
     """Представление для модели Review."""
 
     serializer_class = ReviewSerializer
+    values_serializer_class = ReviewValuesSerializer
     permission_classes = (IsAuthorOrStaff,)
+    pagination_class = PageNumberOrKeysetPagination
+    filter_backends = (ReviewOrderingFilter,)
+    # COMMENTS — в отзыве выводится счетчик комментариев, CATALOG — чтобы
+    # после удаления произведения без отзывов клиент получил 404, а не 304.
+    cache_versions = (REVIEWS, COMMENTS, USERNAMES, CATALOG)
+
+    duplicate_review_message = (
+        'Нельзя оставлять больше 1 отзыва на произведение'
+    )
 
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
+    @property
+    def keyset_ordering(self):
+        ordering = ReviewOrderingFilter().get_ordering(
+            self.request, None, self
+        )
+        return ordering or ('pub_date', 'id')
+
+    @cached_property
+    def title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        return get_object_or_404(
+            Title.objects.only('id', 'name'), pk=self.kwargs.get('title_id')
+        )
 
     def get_queryset(self):
-        return self.get_title().reviews.all().order_by('id')
+        # Автор подгружается в том же запросе, от него нужен только username;
+        # title берется из self.title через связанный менеджер.
+        return self.title.reviews.select_related('author').only(
+            'id', 'title', 'text', 'score', 'pub_date', 'comments_count',
+            'author__username'
+        ).order_by('id')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        # Повторный отзыв отсекает ограничение unique_review в БД, а не
+        # отдельный запрос перед вставкой.
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=self.title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=self.request.user, title=self.title
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    self.duplicate_review_message
+                ]
+            })
+
+
+class CommentViewSet(ConditionalGetMixin, SparseFieldsViewMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     """Представление для модели Comment."""
 
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     permission_classes = (IsAuthorOrStaff,)
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('pub_date', 'id')
+    cache_versions = (COMMENTS, REVIEWS, USERNAMES, CATALOG)
+
+    @cached_property
+    def review(self):
+        """Отзыв из URL, загружается не больше одного раза за запрос."""
+        return get_object_or_404(
+            Review.objects.only('id'),
+            id=self.kwargs.get('review_id'),
+            title=self.kwargs.get('title_id'),
+        )
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(
-            Review,
-            id=review_id,
-            title=title_id,
-        )
-        return review.comments.filter(review__title_id=title_id).order_by('id')
+        # Один запрос по review_id и review__title_id без загрузки отзыва;
+        # отзыв проверяется, только если комментариев не нашлось.
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author').only(
+            'id', 'review', 'text', 'pub_date', 'author__username'
+        ).order_by('id')
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустой список: 404, если отзыва нет или он к другому
+            # произведению.
+            self.review
+        return page
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(
-            Review,
-            id=review_id,
-            title=title_id,
+        serializer.save(author=self.request.user, review=self.review)
+
+
+class RecentReviewViewSet(ConditionalListMixin, SparseFieldsViewMixin,
+                          ValuesListMixin, ListViewSet):
+    """Лента последних отзывов ко всем произведениям.
+
+    Страницы выбираются по курсору по индексу (pub_date, id), поэтому
+    стоимость запроса зависит только от размера страницы.
+    """
+
+    queryset = Review.objects.select_related('title', 'author').only(
+        'id', 'title__name', 'text', 'score', 'pub_date', 'comments_count',
+        'author__username'
+    )
+    serializer_class = RecentReviewSerializer
+    values_serializer_class = RecentReviewValuesSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    cache_versions = (REVIEWS, COMMENTS, USERNAMES, CATALOG)
+
+
+class RecentCommentViewSet(ConditionalListMixin, SparseFieldsViewMixin,
+                           ValuesListMixin, ListViewSet):
+    """Лента последних комментариев ко всем отзывам."""
+
+    queryset = Comment.objects.select_related(
+        'review__title', 'author'
+    ).only(
+        'id', 'review__title__name', 'text', 'pub_date', 'author__username'
+    )
+    serializer_class = RecentCommentSerializer
+    values_serializer_class = RecentCommentValuesSerializer
+    permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-pub_date', '-id')
+    cache_versions = (COMMENTS, USERNAMES, CATALOG)
+
+
+class AuthorActivityMixin:
+    """Mixin отбирает отзывы или комментарии пользователя из URL.
+
+    Вместо имени пользователя можно указать me — текущего пользователя.
+    """
+
+    def get_permissions(self):
+        if self.kwargs.get('username') == 'me':
+            return [permissions.IsAuthenticated()]
+        return super().get_permissions()
+
+    @cached_property
+    def author(self):
+        if self.kwargs.get('username') == 'me':
+            return self.request.user
+        return get_object_or_404(
+            User.objects.only('id'), username=self.kwargs.get('username')
         )
-        serializer.save(author=self.request.user, review=review)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(author=self.author)
+
+    def get_etag_key(self, request):
+        key = super().get_etag_key(request)
+        if self.kwargs.get('username') == 'me':
+            # Путь /users/me/ у всех пользователей одинаковый.
+            key += (request.user.pk,)
+        return key
+
+
+class UserReviewViewSet(AuthorActivityMixin, RecentReviewViewSet):
+    """Отзывы пользователя от новых к старым, по индексу
+    (author, pub_date, id)."""
+
+
+class UserCommentViewSet(AuthorActivityMixin, RecentCommentViewSet):
+    """Комментарии пользователя от новых к старым, по индексу
+    (author, pub_date, id)."""
@@ -0,0 +1,17 @@
+"""Нормализация строк для поиска без учета регистра.
+
+Используется приложениями reviews и users, поэтому не зависит ни от
+одного из них.
+"""
+import unicodedata
+
+
+def normalize_search_text(value):
+    """Приводит строку к виду для поиска без учета регистра.
+
+    В отличие от LOWER и LIKE в SQLite, casefold работает и для кириллицы;
+    «ё» приравнивается к «е».
+    """
+    if value is None:
+        return ''
+    return unicodedata.normalize('NFKC', value).casefold().replace('ё', 'е')
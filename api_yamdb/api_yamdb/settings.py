@@ -65,6 +65,40 @@ DATABASES = {
     }
 }
 
+# Кэш общий для всех процессов: в нем хранятся версии данных, по которым
+# процессы сбрасывают свои кэши ответов, списки лучших произведений
+# и средняя оценка. По умолчанию — файлы в CACHE_DIR, у каждого кэша свой
+# каталог; в продакшене с несколькими серверами CACHE_BACKEND и
+# CACHE_<ИМЯ>_LOCATION (например, CACHE_VERSIONS_LOCATION) указывают на
+# memcached. Версии и счетчики лежат в отдельных кэшах, чтобы их не
+# вытесняли другие записи; недавние регистрации — в своем кэше, чтобы
+# при их большом числе не вытеснялись записи остальных кэшей.
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+)
+CACHE_DIR = os.getenv('CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+
+
+def cache_settings(alias, max_entries, **kwargs):
+    return {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            f'CACHE_{alias.upper()}_LOCATION', os.path.join(CACHE_DIR, alias)
+        ),
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+        **kwargs,
+    }
+
+
+CACHES = {
+    'default': cache_settings('default', 10000),
+    # Кроме общих версий — версии списков лучших произведений по каждой
+    # категории и жанру.
+    'versions': cache_settings('versions', 10000, KEY_PREFIX='versions'),
+    'counters': cache_settings('counters', 1000, KEY_PREFIX='counters'),
+    'signups': cache_settings('signups', 50000, KEY_PREFIX='signups'),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -110,6 +144,41 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
 }
 
+# Наибольший размер страницы, который клиент может запросить page_size.
+MAX_PAGE_SIZE = 100
+
+# Память под кэш ответов /api/v1/titles/ в каждом процессе.
+TITLES_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Наибольшее число произведений, которое фильтр по жанрам, категориям
+# и году отбирает через индекс в памяти, а не запросом к БД.
+CATALOG_INDEX_MAX_IDS = 5000
+
+# Размер списков лучших произведений /api/v1/titles/top/ и время их
+# хранения в кэше.
+TOP_TITLES_SIZE = 10
+TOP_TITLES_TIMEOUT = 60 * 60
+
+# Вес средней оценки по всем произведениям во взвешенном рейтинге:
+# столько оценок нужно произведению, чтобы его собственная средняя
+# весила наравне с ней.
+RATING_PRIOR_WEIGHT = 10
+
+# Наибольшее число произведений в одном запросе /api/v1/titles/bulk/.
+BULK_TITLES_MAX_SIZE = 1000
+
+# Строить списки из строк .values() без ModelSerializer
+# (api/values_serializers.py).
+FAST_READ_SERIALIZERS = True
+
+# Количество строк, читаемых из БД за раз при выгрузке /api/v1/export/.
+EXPORT_CHUNK_SIZE = 1000
+
+# Сколько отзывов и комментариев к каждому из них встраивается в ответ
+# /api/v1/titles/{id}/?expand=reviews,reviews.comments.
+EXPANDED_REVIEWS_SIZE = 10
+EXPANDED_COMMENTS_SIZE = 3
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
     "AUTH_HEADER_TYPES": ("Bearer",),
@@ -125,3 +194,17 @@ DEFAULT_FROM_EMAIL = "admin@yamdb.ru"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Очередь писем: потоки и размер пачки команды send_outbox_emails, на сколько
+# секунд обработчик забирает письма, число попыток и задержка перед
+# повторной попыткой, которая удваивается после каждой неудачи.
+EMAIL_OUTBOX_WORKERS = 4
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_LEASE = 300
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+
+# Сколько секунд повторная регистрация с теми же username и email
+# не отправляет новое письмо.
+SIGNUP_RESEND_WINDOW = 60
@@ -0,0 +1,113 @@
+"""Выгрузка каталога с отзывами и комментариями в NDJSON.
+
+Каждая строка — JSON-объект с полем type: title, review или comment.
+Таблицы читаются через iterator(chunk_size), жанры произведений
+подгружаются одним запросом на пачку, поэтому расход памяти не зависит
+от объема данных.
+"""
+import zlib
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Review, Title
+
+# Заголовок и формат gzip вместо zlib.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_titles(chunk_size):
+    titles = Title.objects.order_by('id').values(
+        'id', 'name', 'year', 'description', 'category__slug',
+        'rating_sum', 'rating_count',
+    ).iterator(chunk_size=chunk_size)
+    for chunk in chunks(titles, chunk_size):
+        genres = {}
+        for title_id, slug in Title.genre.through.objects.filter(
+            title_id__in=[title['id'] for title in chunk]
+        ).order_by('id').values_list('title_id', 'genre__slug'):
+            genres.setdefault(title_id, []).append(slug)
+        for title in chunk:
+            yield {
+                'type': 'title',
+                'id': title['id'],
+                'name': title['name'],
+                'year': title['year'],
+                'description': title['description'],
+                'category': title['category__slug'],
+                'genre': genres.get(title['id'], []),
+                'rating_sum': title['rating_sum'],
+                'rating_count': title['rating_count'],
+            }
+
+
+def export_reviews(chunk_size):
+    reviews = Review.objects.order_by('id').values_list(
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date'
+    ).iterator(chunk_size=chunk_size)
+    for review_id, title_id, author, text, score, pub_date in reviews:
+        yield {
+            'type': 'review',
+            'id': review_id,
+            'title': title_id,
+            'author': author,
+            'text': text,
+            'score': score,
+            'pub_date': pub_date,
+        }
+
+
+def export_comments(chunk_size):
+    comments = Comment.objects.order_by('id').values_list(
+        'id', 'review_id', 'author__username', 'text', 'pub_date'
+    ).iterator(chunk_size=chunk_size)
+    for comment_id, review_id, author, text, pub_date in comments:
+        yield {
+            'type': 'comment',
+            'id': comment_id,
+            'review': review_id,
+            'author': author,
+            'text': text,
+            'pub_date': pub_date,
+        }
+
+
+def export_lines(chunk_size=1000):
+    """Строки NDJSON в байтах: произведения, отзывы, комментарии."""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for export in (export_titles, export_reviews, export_comments):
+        for obj in export(chunk_size):
+            yield (encoder.encode(obj) + '\n').encode('utf-8')
+
+
+def join_stream(lines, min_size=64 * 1024):
+    """Склеивает строки в куски не меньше min_size байт."""
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= min_size:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_stream(lines):
+    """Сжимает поток байтов в gzip."""
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    for data in join_stream(lines):
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.export import export_lines, gzip_stream, join_stream
+
+
+class Command(BaseCommand):
+    """Выгружает произведения, отзывы и комментарии в NDJSON.
+
+    Таблицы читаются пачками, поэтому расход памяти не зависит от объема
+    данных. Пример запуска команды:
+    python manage.py export_catalog --output catalog.ndjson.gz --gzip
+    Без --output данные выводятся в stdout.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для выгрузки, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество строк, читаемых из БД за раз'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжать выгрузку в gzip'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('Размер пачки должен быть больше 0')
+        lines = export_lines(options['chunk_size'])
+        stream = gzip_stream(lines) if options['gzip'] else join_stream(lines)
+        if options['output'] == '-':
+            self.write(sys.stdout.buffer, stream)
+            return
+        with open(options['output'], 'wb') as output:
+            self.write(output, stream)
+
+    def write(self, output, stream):
+        for data in stream:
+            output.write(data)
+        output.flush()
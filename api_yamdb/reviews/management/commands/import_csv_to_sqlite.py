@@ -1,7 +1,10 @@
 import csv
 import sqlite3 as sq
 
-from django.core.management import BaseCommand
+from django.apps import apps
+from django.core.management import BaseCommand, call_command
+
+from reviews.versions import CATALOG, REVIEWS, bump_version
 
 DIR = 'static/data/'
 SQL_TEMP = 'INSERT INTO {table} ({fields}) VALUES ({values});'
@@ -27,6 +30,23 @@ CSV_FILES = {
 }
 
 
+def default_columns(table_name, fields):
+    """Колонки NOT NULL, которых нет в csv, и их значения по умолчанию.
+
+    Их заполняют команды, запускаемые после загрузки.
+    """
+    model = next(
+        model for model in apps.get_models()
+        if model._meta.db_table == table_name
+    )
+    return [
+        (field.column, field.get_default())
+        for field in model._meta.concrete_fields
+        if field.column not in fields.split(',')
+        and not field.null and field.has_default()
+    ]
+
+
 class Command(BaseCommand):
     """Копирует данные из csv-файлов в БД.
 
@@ -40,14 +60,23 @@ class Command(BaseCommand):
             try:
                 with open(f'{DIR}{file_name}', encoding='utf-8') as csv_file:
                     reader = csv.DictReader(csv_file)
+                    defaults = default_columns(
+                        table_meta['table_name'], table_meta['fields']
+                    )
                     to_db = [
                         [k[i] for i in table_meta['table_fields']]
+                        + [value for _, value in defaults]
                         for k in reader
                     ]
+                fields = [table_meta['fields']]
+                fields += [column for column, _ in defaults]
                 cur.executemany(SQL_TEMP.format(
                     table=table_meta['table_name'],
-                    fields=table_meta['fields'],
-                    values=','.join(['?'] * len(table_meta['table_fields']))),
+                    fields=','.join(fields),
+                    values=','.join(
+                        ['?'] * (len(table_meta['table_fields'])
+                                 + len(defaults))
+                    )),
                     to_db)
                 con.commit()
                 csv_file.close()
@@ -56,3 +85,9 @@ class Command(BaseCommand):
             else:
                 print(f'Загрузка данных из {file_name} прошла успешно')
         con.close()
+        call_command('recalculate_ratings')
+        call_command('refresh_rating_prior')
+        call_command('rebuild_title_search')
+        call_command('update_search_columns')
+        bump_version(CATALOG)
+        bump_version(REVIEWS)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.search import is_search_index_available, rebuild_search_index
+from reviews.versions import CATALOG, bump_version
+
+
+class Command(BaseCommand):
+    """Перестраивает полнотекстовый индекс произведений.
+
+    Нужна после загрузки данных в обход ORM.
+    Запуск команды: python manage.py rebuild_title_search
+    """
+
+    def handle(self, *args, **kwargs):
+        if not is_search_index_available():
+            raise CommandError(
+                'Полнотекстовый индекс доступен только в SQLite'
+            )
+        with transaction.atomic():
+            rebuild_search_index()
+        bump_version(CATALOG)
+        self.stdout.write('Поисковый индекс произведений перестроен')
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from reviews.models import Comment, Review
+from reviews.versions import REVIEWS, bump_version
+
+
+class Command(BaseCommand):
+    """Проверяет и исправляет счетчики комментариев отзывов.
+
+    Отзывы проверяются диапазонами id: на диапазон выполняется один
+    запрос к отзывам и один к комментариям, отзывы с расхождениями
+    исправляются запросом UPDATE с подзапросом. Количество отзывов
+    произведения — это количество оценок, его исправляет команда
+    recalculate_ratings.
+    Пример запуска команды:
+    python manage.py recalculate_counters --chunk-size 1000
+    С флагом --check команда только сообщает о расхождениях.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество id отзывов в одном диапазоне'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить счетчики, ничего не изменяя'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('Размер диапазона должен быть больше 0')
+        bounds = Review.objects.aggregate(Min('id'), Max('id'))
+        if bounds['id__min'] is None:
+            self.stdout.write('Нет отзывов для проверки')
+            return
+        stale = 0
+        for start in range(bounds['id__min'], bounds['id__max'] + 1,
+                           chunk_size):
+            review_ids = self.find_stale(start, start + chunk_size - 1)
+            stale += len(review_ids)
+            if review_ids and not options['check']:
+                self.repair(review_ids)
+        if options['check']:
+            if stale:
+                raise CommandError(
+                    f'Найдено отзывов с неверным счетчиком: {stale}'
+                )
+            self.stdout.write('Счетчики всех отзывов верны')
+            return
+        if stale:
+            bump_version(REVIEWS)
+        self.stdout.write(f'Исправлено счетчиков отзывов: {stale}')
+
+    def find_stale(self, first, last):
+        """Возвращает id отзывов диапазона с неверным счетчиком."""
+        counts = dict(
+            Comment.objects.filter(review__gte=first, review__lte=last)
+            .order_by().values_list('review_id').annotate(Count('id'))
+        )
+        return [
+            review_id
+            for review_id, comments_count in Review.objects.filter(
+                id__gte=first, id__lte=last
+            ).order_by().values_list('id', 'comments_count')
+            if counts.get(review_id, 0) != comments_count
+        ]
+
+    def repair(self, review_ids):
+        # Количество считается в том же UPDATE, поэтому комментарии,
+        # добавленные после проверки, не теряются.
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(total=Count('id'))
+        Review.objects.filter(id__in=review_ids).update(
+            comments_count=Coalesce(Subquery(comments.values('total')), 0)
+        )
@@ -0,0 +1,143 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import (Avg, Count, Max, Min, OuterRef, Subquery,
+                              Sum)
+from django.db.models.functions import Coalesce
+
+from reviews.models import SCORES, Review, Title, score_count_field
+from reviews.ratings import update_weighted_ratings
+from reviews.signals import rating_fields
+from reviews.top import invalidate_top
+from reviews.versions import REVIEWS, bump_version
+
+RATING_FIELDS = [
+    'rating_sum',
+    'rating_count',
+    'rating_avg',
+    *(score_count_field(score) for score in SCORES),
+]
+
+
+class Command(BaseCommand):
+    """Проверяет и пересчитывает сохраненные рейтинги произведений.
+
+    Вместе с суммой, количеством и средней оценкой проверяется
+    распределение оценок. Произведения проверяются диапазонами id
+    параллельно в нескольких потоках, затем рейтинги с расхождениями
+    пересчитываются запросом UPDATE с подзапросами по отзывам.
+    Пример запуска команды:
+    python manage.py recalculate_ratings --chunk-size 1000 --workers 4
+    С флагом --check команда только сообщает о расхождениях.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество id произведений в одном диапазоне'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Количество потоков'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, ничего не изменяя'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1 or options['workers'] < 1:
+            raise CommandError(
+                'Размер диапазона и количество потоков должны быть больше 0'
+            )
+        bounds = Title.objects.aggregate(Min('id'), Max('id'))
+        if bounds['id__min'] is None:
+            self.stdout.write('Нет произведений для проверки')
+            return
+        chunks = [
+            (start, start + chunk_size - 1)
+            for start in range(bounds['id__min'], bounds['id__max'] + 1,
+                               chunk_size)
+        ]
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            stale = [
+                title_id
+                for chunk_stale in executor.map(self.find_stale, chunks)
+                for title_id in chunk_stale
+            ]
+        if options['check']:
+            if stale:
+                raise CommandError(
+                    f'Найдено произведений с неверным рейтингом: {len(stale)}'
+                )
+            self.stdout.write('Рейтинги всех произведений верны')
+            return
+        for start in range(0, len(stale), chunk_size):
+            self.repair(stale[start:start + chunk_size])
+        if stale:
+            bump_version(REVIEWS)
+            invalidate_top()
+        self.stdout.write(f'Исправлено рейтингов произведений: {len(stale)}')
+
+    def find_stale(self, chunk):
+        """Возвращает id произведений диапазона с неверным рейтингом."""
+        try:
+            stored = Title.objects.filter(
+                id__gte=chunk[0], id__lte=chunk[1]
+            ).values('id', *RATING_FIELDS)
+            distributions = defaultdict(dict)
+            score_counts = (
+                Review.objects.filter(title__gte=chunk[0],
+                                      title__lte=chunk[1])
+                .order_by()
+                .values_list('title_id', 'score')
+                .annotate(Count('id'))
+            )
+            for title_id, score, count in score_counts:
+                distributions[title_id][score] = count
+            return [
+                title['id']
+                for title in stored
+                if {field: title[field] for field in RATING_FIELDS}
+                != rating_fields(distributions[title['id']])
+            ]
+        finally:
+            # У каждого потока свое соединение с БД.
+            connection.close()
+
+    def repair(self, title_ids):
+        # Значения считаются в том же UPDATE, поэтому отзывы, добавленные
+        # после проверки, не теряются.
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        score_counts = {
+            score_count_field(score): Coalesce(Subquery(
+                reviews.filter(score=score)
+                .annotate(total=Count('id')).values('total')
+            ), 0)
+            for score in SCORES
+        }
+        Title.objects.filter(id__in=title_ids).update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            rating_avg=Subquery(
+                reviews.annotate(total=Avg('score')).values('total')
+            ),
+            **score_counts,
+        )
+        update_weighted_ratings(Title.objects.filter(id__in=title_ids))
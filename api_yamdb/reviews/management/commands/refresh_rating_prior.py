@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.ratings import (calculate_rating_prior, set_rating_prior,
+                             update_weighted_ratings)
+from reviews.versions import REVIEWS, bump_version
+
+
+class Command(BaseCommand):
+    """Обновляет среднюю оценку по всем произведениям и пересчитывает
+    взвешенный рейтинг каждого произведения.
+
+    Рекомендуется запускать периодически, например раз в сутки по cron.
+    Запуск команды: python manage.py refresh_rating_prior
+    """
+
+    def handle(self, *args, **kwargs):
+        prior = calculate_rating_prior()
+        # Сначала обновляется кэш, чтобы отзывы, сохраненные во время
+        # пересчета, тоже использовали новую оценку.
+        set_rating_prior(prior)
+        with transaction.atomic():
+            updated = update_weighted_ratings(Title.objects.all(), prior)
+        bump_version(REVIEWS)
+        self.stdout.write(
+            f'Средняя оценка {prior:.2f}, '
+            f'пересчитано произведений: {updated}'
+        )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from api_yamdb.search_utils import normalize_search_text
+from reviews.models import Category, Genre, Title
+from reviews.versions import CATALOG, bump_version
+from users.models import User
+
+SEARCH_COLUMNS = (
+    (Category, 'name', 'name_search'),
+    (Genre, 'name', 'name_search'),
+    (Title, 'name', 'name_search'),
+    (User, 'username', 'username_search'),
+)
+
+
+class Command(BaseCommand):
+    """Заполняет нормализованные поля для поиска.
+
+    Нужна после загрузки данных в обход ORM.
+    Запуск команды: python manage.py update_search_columns
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество объектов, обновляемых одним запросом'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model, source, target in SEARCH_COLUMNS:
+            updated = 0
+            batch = []
+            queryset = model.objects.only('pk', source, target).order_by('pk')
+            for obj in queryset.iterator(chunk_size=batch_size):
+                value = normalize_search_text(getattr(obj, source))
+                if getattr(obj, target) != value:
+                    setattr(obj, target, value)
+                    batch.append(obj)
+                if len(batch) == batch_size:
+                    updated += self.flush(model, batch, target)
+            updated += self.flush(model, batch, target)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: обновлено {updated}'
+            )
+        bump_version(CATALOG)
+
+    def flush(self, model, batch, target):
+        count = len(batch)
+        if batch:
+            model.objects.bulk_update(batch, [target])
+            batch.clear()
+        return count
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:06
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_ratings(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    aggregates = Review.objects.order_by().values('title_id').annotate(
+        Sum('score'), Count('id')
+    )
+    for row in aggregates.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            rating_sum=row['score__sum'],
+            rating_count=row['id__count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_auto_20220730_1510'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:11
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5('
+        'name, description, tokenize="unicode61 remove_diacritics 2")'
+    )
+    schema_editor.execute(
+        'INSERT INTO reviews_title_fts (rowid, name, description) '
+        "SELECT id, name, COALESCE(description, '') FROM reviews_title"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS reviews_title_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_auto_20261018_1806'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:17
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize_search_text(value):
+    # Копия api_yamdb.search_utils.normalize_search_text на момент
+    # миграции: миграция не должна зависеть от кода приложений.
+    if value is None:
+        return ''
+    return unicodedata.normalize('NFKC', value).casefold().replace('ё', 'е')
+
+
+def fill_name_search(apps, schema_editor):
+    for model_name in ('Category', 'Genre', 'Title'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.only('id', 'name'))
+        for obj in objects:
+            obj.name_search = normalize_search_text(obj.name)
+        model.objects.bulk_update(objects, ['name_search'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_auto_20261018_1811'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.RunPython(fill_name_search, migrations.RunPython.noop),
+    ]
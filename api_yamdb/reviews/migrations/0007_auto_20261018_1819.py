@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Покрывающий индекс связи произведений и жанров со стороны жанра.
+
+    Уникальный индекс (title_id, genre_id) Django создает сам, индекс
+    (genre_id, title_id) позволяет отбирать произведения по жанрам без
+    обращения к таблице.
+    """
+
+    dependencies = [
+        ('reviews', '0006_auto_20261018_1817'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX reviews_title_genre_genre_title_idx '
+            'ON reviews_title_genre (genre_id, title_id)',
+            'DROP INDEX reviews_title_genre_genre_title_idx',
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:22
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField
+from django.db.models.functions import Cast
+import reviews.validators
+
+
+def fill_rating_avg(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(rating_count__gt=0).update(
+        rating_avg=ExpressionWrapper(
+            Cast(F('rating_sum'), FloatField()) / F('rating_count'),
+            output_field=FloatField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_auto_20261018_1819'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_avg',
+            field=models.FloatField(db_index=True, default=0, editable=False, verbose_name='Средняя оценка'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.IntegerField(blank=True, db_index=True, null=True, validators=[reviews.validators.validate_year], verbose_name='Дата выхода'),
+        ),
+        migrations.RunPython(fill_rating_avg, migrations.RunPython.noop),
+    ]
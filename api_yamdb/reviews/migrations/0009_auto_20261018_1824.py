@@ -0,0 +1,80 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_score_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    for score in range(1, 11):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk'), score=score
+        ).order_by().values('title').annotate(total=Count('id'))
+        Title.objects.update(**{
+            f'score_{score}_count': Coalesce(
+                Subquery(reviews.values('total')), 0
+            )
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_auto_20261018_1822'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_10_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок 9'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:28
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, Sum, Value
+
+
+def fill_rating_weighted(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.aggregate(Sum('rating_sum'), Sum('rating_count'))
+    if not totals['rating_count__sum']:
+        return
+    prior = totals['rating_sum__sum'] / totals['rating_count__sum']
+    weight = settings.RATING_PRIOR_WEIGHT
+    Title.objects.filter(rating_count__gt=0).update(
+        rating_weighted=ExpressionWrapper(
+            (F('rating_sum') + Value(float(weight * prior)))
+            / (F('rating_count') + weight),
+            output_field=FloatField()
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_auto_20261018_1824'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_weighted',
+            field=models.FloatField(db_index=True, default=0, editable=False, verbose_name='Взвешенная оценка'),
+        ),
+        migrations.RunPython(fill_rating_weighted, migrations.RunPython.noop),
+    ]
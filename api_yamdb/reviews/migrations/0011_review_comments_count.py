@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = Comment.objects.filter(
+        review=OuterRef('pk')
+    ).order_by().values('review').annotate(total=Count('id')).values('total')
+    Review.objects.update(comments_count=Coalesce(Subquery(comments), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_rating_weighted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'comments_count'], name='review_title_comments_idx'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
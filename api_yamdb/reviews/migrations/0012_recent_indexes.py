@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_review_comments_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-pub_date', '-id'], name='comment_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-pub_date', '-id'], name='review_recent_idx'),
+        ),
+    ]
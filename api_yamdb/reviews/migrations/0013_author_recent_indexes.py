@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_recent_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='comment_author_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='review_author_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+def clear_unrated(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(rating_count=0).update(
+        rating_avg=None, rating_weighted=None
+    )
+
+
+def zero_unrated(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(rating_count=0).update(
+        rating_avg=0, rating_weighted=0
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_comment_review_date_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='rating_avg',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Средняя оценка'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='rating_weighted',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Взвешенная оценка'),
+        ),
+        migrations.RunPython(clear_unrated, zero_unrated),
+    ]
@@ -1,11 +1,69 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
+from api_yamdb.search_utils import normalize_search_text
 from users.models import User
 from .validators import validate_year
 
+MIN_SCORE = 1
+MAX_SCORE = 10
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
 
-class Genre(models.Model):
+
+def score_count_field(score):
+    """Имя поля произведения с количеством оценок score."""
+    return f'score_{score}_count'
+
+
+class CounterFieldsMixin(models.Model):
+    """Не перезаписывает при сохранении поля, которые поддерживают сигналы.
+
+    Поля из counter_fields изменяются только запросами UPDATE с F(), поэтому
+    save() без update_fields у существующего объекта их пропускает: иначе
+    сохранение объекта, загруженного до изменения, вернуло бы старые
+    значения.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class NameSearchMixin(models.Model):
+    """Поддерживает нормализованную копию названия для поиска."""
+
+    name_search = models.CharField(
+        verbose_name='Название для поиска',
+        max_length=256,
+        db_index=True,
+        editable=False,
+        default=''
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.name_search = normalize_search_text(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_search'}
+        super().save(*args, **kwargs)
+
+
+class Genre(NameSearchMixin):
     """Класс, описывающий жанр."""
 
     name = models.CharField(
@@ -28,7 +86,7 @@ class Genre(models.Model):
         return self.name
 
 
-class Category(models.Model):
+class Category(NameSearchMixin):
     """Класс, описывающий категорию."""
 
     name = models.CharField(
@@ -51,7 +109,7 @@ class Category(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class Title(CounterFieldsMixin, NameSearchMixin):
     """Класс, описывающий произведение."""
 
     name = models.CharField(
@@ -63,7 +121,8 @@ class Title(models.Model):
         verbose_name='Дата выхода',
         validators=[validate_year],
         null=True,
-        blank=True
+        blank=True,
+        db_index=True
     )
     description = models.TextField(
         verbose_name='Описание',
@@ -83,6 +142,92 @@ class Title(models.Model):
         null=True,
         blank=True
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    rating_avg = models.FloatField(
+        verbose_name='Средняя оценка',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+    rating_weighted = models.FloatField(
+        verbose_name='Взвешенная оценка',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+    # Распределение оценок: поле score_count_field(score) для каждой
+    # оценки из SCORES.
+    score_1_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 1',
+        default=0,
+        editable=False
+    )
+    score_2_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 2',
+        default=0,
+        editable=False
+    )
+    score_3_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 3',
+        default=0,
+        editable=False
+    )
+    score_4_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 4',
+        default=0,
+        editable=False
+    )
+    score_5_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 5',
+        default=0,
+        editable=False
+    )
+    score_6_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 6',
+        default=0,
+        editable=False
+    )
+    score_7_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 7',
+        default=0,
+        editable=False
+    )
+    score_8_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 8',
+        default=0,
+        editable=False
+    )
+    score_9_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 9',
+        default=0,
+        editable=False
+    )
+    score_10_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок 10',
+        default=0,
+        editable=False
+    )
+
+    # Рейтинг и распределение оценок изменяют сигналы отзывов.
+    counter_fields = (
+        'rating_sum',
+        'rating_count',
+        'rating_avg',
+        'rating_weighted',
+        *(score_count_field(score) for score in SCORES),
+    )
 
     class Meta:
         constraints = [
@@ -91,12 +236,33 @@ class Title(models.Model):
                 name='unique_name_category'
             )
         ]
+        indexes = [
+            # Список произведений по курсору в порядке по умолчанию.
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средняя оценка или None, если оценок нет."""
+        return self.rating_avg
+
+    @property
+    def weighted_rating(self):
+        """Взвешенная оценка или None, если оценок нет."""
+        return self.rating_weighted
+
+    @property
+    def score_distribution(self):
+        """Количество отзывов с каждой оценкой."""
+        return {
+            score: getattr(self, score_count_field(score)) for score in SCORES
+        }
 
-class Review(models.Model):
+
+class Review(CounterFieldsMixin, models.Model):
     """Класс, описывающий отзывы."""
 
     title = models.ForeignKey(
@@ -112,12 +278,22 @@ class Review(models.Model):
         related_name='reviews')
     score = models.PositiveSmallIntegerField(
         'Оценка',
-        validators=[MinValueValidator(1), MaxValueValidator(10)],
+        validators=[
+            MinValueValidator(MIN_SCORE),
+            MaxValueValidator(MAX_SCORE)
+        ],
     )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         auto_now_add=True
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+
+    counter_fields = ('comments_count',)
 
     class Meta:
         constraints = [
@@ -125,6 +301,27 @@ class Review(models.Model):
                 fields=["author", "title"], name="unique_review"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'comments_count'],
+                name='review_title_comments_idx'
+            ),
+            # Отзывы произведения по курсору в порядке по умолчанию.
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_date_idx'
+            ),
+            # Лента последних отзывов.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='review_recent_idx'
+            ),
+            # Последние отзывы пользователя.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='review_author_recent_idx'
+            ),
+        ]
         ordering = ["-pub_date"]
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
@@ -133,6 +330,28 @@ class Review(models.Model):
     def __str__(self):
         return f'Отзыв на {self.title} от {self.author}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def remember_loaded_values(self):
+        """Запоминает произведение и оценку, сохраненные в БД.
+
+        По ним сигналы пересчитывают рейтинг произведения при изменении
+        или удалении отзыва.
+        """
+        self._loaded_values = {
+            'title_id': self.__dict__.get('title_id'),
+            'score': self.__dict__.get('score'),
+        }
+
+    def save(self, *args, **kwargs):
+        # Отзыв и рейтинг произведения сохраняются в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Класс, описывающий комментарии."""
@@ -155,9 +374,41 @@ class Comment(models.Model):
     )
 
     class Meta:
+        indexes = [
+            # Лента последних комментариев.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='comment_recent_idx'
+            ),
+            # Комментарии отзыва по курсору.
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_date_idx'
+            ),
+            # Последние комментарии пользователя.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='comment_author_recent_idx'
+            ),
+        ]
         ordering = ["-pub_date"]
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
 
     def __str__(self):
         return f'Комментарий на {self.review} от {self.author}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def remember_loaded_values(self):
+        """Запоминает отзыв, сохраненный в БД, для счетчика комментариев."""
+        self._loaded_review_id = self.__dict__.get('review_id')
+
+    def save(self, *args, **kwargs):
+        # Комментарий и счетчик отзыва сохраняются в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
@@ -0,0 +1,77 @@
+"""Взвешенный (байесовский) рейтинг произведений.
+
+Взвешенный рейтинг — средняя оценка произведения, сглаженная к средней
+оценке по всем произведениям (априорной оценке):
+(сумма + m * C) / (количество + m), где C — априорная оценка,
+m — RATING_PRIOR_WEIGHT. Произведение с одной оценкой 10 не обгоняет
+произведение с тысячами высоких оценок.
+
+Рейтинг хранится в поле rating_weighted и пересчитывается по сохраненным
+сумме и количеству оценок вместе с ними. Априорная оценка хранится в кэше
+Django и обновляется командой refresh_rating_prior, которая пересчитывает
+и взвешенный рейтинг всех произведений.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (Case, ExpressionWrapper, F, FloatField, Q,
+                              Sum, Value, When)
+
+from .models import MAX_SCORE, MIN_SCORE, Title
+
+PRIOR_KEY = 'rating:prior'
+
+
+def calculate_rating_prior():
+    """Средняя оценка по всем произведениям."""
+    totals = Title.objects.aggregate(Sum('rating_sum'), Sum('rating_count'))
+    if not totals['rating_count__sum']:
+        return (MIN_SCORE + MAX_SCORE) / 2
+    return totals['rating_sum__sum'] / totals['rating_count__sum']
+
+
+def get_rating_prior():
+    """Априорная оценка из кэша; при промахе вычисляется по БД."""
+    prior = cache.get(PRIOR_KEY)
+    if prior is None:
+        prior = calculate_rating_prior()
+        cache.add(PRIOR_KEY, prior, timeout=None)
+        prior = cache.get(PRIOR_KEY, prior)
+    return prior
+
+
+def set_rating_prior(prior):
+    cache.set(PRIOR_KEY, prior, timeout=None)
+
+
+def weighted_rating(rating_sum, rating_count, prior):
+    """Взвешенный рейтинг или None, если оценок нет."""
+    if not rating_count:
+        return None
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (rating_sum + weight * prior) / (rating_count + weight)
+
+
+def weighted_rating_expression(prior, rating_sum=F('rating_sum'),
+                               rating_count=F('rating_count'),
+                               empty=Q(rating_count=0)):
+    """Выражение для UPDATE, вычисляющее weighted_rating в БД.
+
+    empty — условие на строку, при котором у произведения нет оценок.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return Case(
+        When(empty, then=Value(None)),
+        default=ExpressionWrapper(
+            (rating_sum + Value(float(weight * prior)))
+            / (rating_count + weight),
+            output_field=FloatField()
+        ),
+        output_field=FloatField()
+    )
+
+
+def update_weighted_ratings(titles, prior=None):
+    """Пересчитывает взвешенный рейтинг произведений одним UPDATE."""
+    if prior is None:
+        prior = get_rating_prior()
+    return titles.update(rating_weighted=weighted_rating_expression(prior))
@@ -0,0 +1,114 @@
+"""Поиск по произведениям, жанрам, категориям и пользователям.
+
+Для поиска без учета регистра у моделей есть поля *_search с
+нормализованным значением, по ним работает индексируемый поиск по
+префиксу. Полнотекстовый индекс по названию и описанию произведений
+хранится в виртуальной таблице SQLite FTS5 и обновляется сигналами при
+сохранении и удалении произведений. После загрузки данных в обход ORM
+поля и индекс заполняются командами update_search_columns и
+rebuild_title_search.
+"""
+import re
+
+from django.db import connection
+from django.db.models import CharField, Lookup
+
+FTS_TABLE = 'reviews_title_fts'
+
+WORD_RE = re.compile(r'\w+')
+
+# Наибольший символ Unicode: верхняя граница диапазона для поиска
+# по префиксу.
+MAX_CHAR = '\U0010ffff'
+
+
+@CharField.register_lookup
+class Prefix(Lookup):
+    """Поиск по префиксу диапазоном значений, который использует индекс."""
+
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        upper_params = [param + MAX_CHAR for param in rhs_params]
+        return (
+            f'({lhs} >= {rhs} AND {lhs} < {rhs})',
+            lhs_params + rhs_params + lhs_params + upper_params
+        )
+
+
+def is_search_index_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Строит запрос FTS5: все слова должны встречаться, как префиксы.
+
+    Каждое слово берется в кавычки, поэтому операторы FTS5 во вводе
+    пользователя не интерпретируются.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(text))
+
+
+def index_title(title):
+    index_titles([title])
+
+
+def index_titles(titles):
+    if not is_search_index_available() or not titles:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [[title.pk] for title in titles]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'VALUES (%s, %s, %s)',
+            [[title.pk, title.name, title.description or '']
+             for title in titles]
+        )
+
+
+def unindex_title(title_id):
+    if not is_search_index_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title_id]
+        )
+
+
+def rebuild_search_index():
+    """Заполняет индекс заново по всем произведениям."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f"SELECT id, name, COALESCE(description, '') FROM reviews_title"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) "
+                       f"VALUES ('optimize')")
+
+
+def search_titles(queryset, text):
+    """Оставляет произведения, подходящие под запрос, по убыванию
+    релевантности."""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_search_index_available():
+        words = WORD_RE.findall(text)
+        for word in words:
+            queryset = queryset.filter(name__icontains=word)
+        return queryset
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = reviews_title.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        order_by=[f'{FTS_TABLE}.rank'],
+    )
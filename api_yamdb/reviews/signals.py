@@ -0,0 +1,203 @@
+from django.db import transaction
+from django.db.models import (Case, Count, ExpressionWrapper, F, FloatField,
+                              Q, Value, When)
+from django.db.models.functions import Cast
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from users.models import User
+from .models import (SCORES, Category, Comment, Genre, Review, Title,
+                     score_count_field)
+from .ratings import (get_rating_prior, weighted_rating,
+                      weighted_rating_expression)
+from .search import index_title, unindex_title
+from .top import invalidate_title_top
+from .versions import (CATALOG, COMMENTS, REVIEWS, USERNAMES, USERS,
+                       bump_version)
+
+
+def change_title_rating(title_id, added=None, removed=None):
+    """Атомарно изменяет сумму, количество и распределение оценок
+    произведения.
+
+    added — новая оценка, removed — удаленная оценка.
+    """
+    score_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    rating_sum = F('rating_sum') + score_delta
+    rating_count = F('rating_count') + count_delta
+    # В UPDATE все F() ссылаются на старые значения, поэтому средняя
+    # считается по новым сумме и количеству явно.
+    empty = Q(rating_count=-count_delta)
+    rating_avg = Case(
+        When(empty, then=Value(None)),
+        default=ExpressionWrapper(
+            Cast(rating_sum, FloatField()) / rating_count,
+            output_field=FloatField()
+        ),
+        output_field=FloatField()
+    )
+    score_counts = {}
+    if added is not None:
+        field = score_count_field(added)
+        score_counts[field] = F(field) + 1
+    if removed is not None:
+        field = score_count_field(removed)
+        score_counts[field] = score_counts.get(field, F(field)) - 1
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating_avg=rating_avg,
+        rating_weighted=weighted_rating_expression(
+            get_rating_prior(), rating_sum, rating_count, empty
+        ),
+        **score_counts,
+    )
+
+
+def rating_fields(distribution):
+    """Значения полей рейтинга по распределению оценок {оценка: число}."""
+    rating_sum = sum(score * count for score, count in distribution.items())
+    rating_count = sum(distribution.values())
+    fields = {
+        score_count_field(score): distribution.get(score, 0)
+        for score in SCORES
+    }
+    fields.update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating_avg=rating_sum / rating_count if rating_count else None,
+    )
+    return fields
+
+
+def recalculate_title_rating(title_id):
+    """Пересчитывает рейтинг произведения по всем его отзывам."""
+    distribution = dict(
+        Review.objects.filter(title_id=title_id).order_by()
+        .values_list('score').annotate(Count('id'))
+    )
+    fields = rating_fields(distribution)
+    Title.objects.filter(pk=title_id).update(
+        rating_weighted=weighted_rating(
+            fields['rating_sum'], fields['rating_count'], get_rating_prior()
+        ),
+        **fields,
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None)
+    if created:
+        change_title_rating(instance.title_id, added=instance.score)
+    elif loaded is None or loaded['score'] is None:
+        recalculate_title_rating(instance.title_id)
+    elif loaded['title_id'] != instance.title_id:
+        change_title_rating(loaded['title_id'], removed=loaded['score'])
+        change_title_rating(instance.title_id, added=instance.score)
+    elif loaded['score'] != instance.score:
+        change_title_rating(
+            instance.title_id,
+            added=instance.score,
+            removed=loaded['score'],
+        )
+    instance.remember_loaded_values()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or loaded['score'] is None:
+        loaded = {'title_id': instance.title_id, 'score': instance.score}
+    change_title_rating(loaded['title_id'], removed=loaded['score'])
+
+
+def change_comments_count(review_id, delta):
+    """Атомарно изменяет счетчик комментариев отзыва."""
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, **kwargs):
+    loaded_review_id = getattr(instance, '_loaded_review_id', None)
+    if created:
+        change_comments_count(instance.review_id, 1)
+    elif loaded_review_id not in (None, instance.review_id):
+        change_comments_count(loaded_review_id, -1)
+        change_comments_count(instance.review_id, 1)
+    instance.remember_loaded_values()
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    # При каскадном удалении отзыва UPDATE просто не найдет строку.
+    change_comments_count(
+        getattr(instance, '_loaded_review_id', None) or instance.review_id,
+        -1
+    )
+
+
+def bump_version_on_commit(name):
+    # Версия меняется только после фиксации транзакции, иначе конкурентный
+    # запрос успеет закэшировать старые данные под новой версией.
+    transaction.on_commit(lambda: bump_version(name))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_catalog_version(sender, action='post_save', **kwargs):
+    if action.startswith('post_'):
+        bump_version_on_commit(CATALOG)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_reviews_version(sender, **kwargs):
+    bump_version_on_commit(REVIEWS)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comments_version(sender, **kwargs):
+    bump_version_on_commit(COMMENTS)
+
+
+@receiver(post_save, sender=User)
+def bump_users_version(sender, instance, created, **kwargs):
+    bump_version_on_commit(USERS)
+    # Имя пользователя выводится в отзывах и комментариях. У нового
+    # пользователя их еще нет, поэтому регистрация эти кэши не сбрасывает.
+    loaded_username = getattr(instance, '_loaded_username', None)
+    if not created and instance.username != loaded_username:
+        bump_version_on_commit(USERNAMES)
+
+
+@receiver(post_delete, sender=User)
+def bump_users_version_on_delete(sender, **kwargs):
+    bump_version_on_commit(USERS)
+    bump_version_on_commit(USERNAMES)
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, **kwargs):
+    index_title(instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_title(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_top_titles(sender, instance, **kwargs):
+    title_id = instance.title_id
+    transaction.on_commit(lambda: invalidate_title_top(title_id))
@@ -0,0 +1,87 @@
+"""Лучшие произведения по рейтингу в целом, по категориям и жанрам.
+
+Список id для каждой области хранится в кэше Django. Ключ включает
+версию каталога и версию области: изменение жанров, категорий или
+состава произведений сбрасывает все списки, а изменение рейтинга
+произведения — только списки его областей. Списки не изменяются на
+месте, поэтому одновременные изменения не теряются: после смены версии
+список строится заново при следующем запросе.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Title
+from .versions import CATALOG, bump_version, get_versions
+
+ALL = 'all'
+TOP = 'top'
+
+
+def scope_version(scope):
+    return f'{TOP}:{scope}'
+
+
+def scope_key(scope):
+    versions = ':'.join(
+        str(version)
+        for version in get_versions(CATALOG, TOP, scope_version(scope))
+    )
+    return f'top:{versions}:{scope}'
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def genre_scope(genre_id):
+    return f'genre:{genre_id}'
+
+
+def build_top(scope):
+    titles = Title.objects.filter(rating_count__gt=0)
+    kind, _, scope_id = scope.partition(':')
+    if kind == 'category':
+        titles = titles.filter(category_id=scope_id)
+    elif kind == 'genre':
+        titles = titles.filter(genre__id=scope_id)
+    return list(titles.order_by('-rating_avg', 'id').values_list(
+        'id', flat=True
+    )[:settings.TOP_TITLES_SIZE])
+
+
+def get_top(scope=ALL):
+    """Возвращает id лучших произведений области по убыванию оценки."""
+    key = scope_key(scope)
+    entries = cache.get(key)
+    if entries is None:
+        entries = build_top(scope)
+        cache.set(key, entries, settings.TOP_TITLES_TIMEOUT)
+    return entries
+
+
+def title_scopes(title_id):
+    """Области, к которым относится произведение."""
+    title = Title.objects.filter(pk=title_id).values('category_id').first()
+    if title is None:
+        return []
+    scopes = [ALL]
+    if title['category_id'] is not None:
+        scopes.append(category_scope(title['category_id']))
+    scopes.extend(
+        genre_scope(genre_id)
+        for genre_id in Title.genre.through.objects.filter(
+            title_id=title_id
+        ).values_list('genre_id', flat=True)
+    )
+    return scopes
+
+
+def invalidate_title_top(title_id):
+    """Сбрасывает списки всех областей, к которым относится произведение."""
+    for scope in title_scopes(title_id):
+        bump_version(scope_version(scope))
+
+
+def invalidate_top():
+    """Сбрасывает списки всех областей."""
+    bump_version(TOP)
@@ -0,0 +1,68 @@
+"""Версии данных для инвалидации кэшей.
+
+Версии хранятся в общем для всех процессов кэше versions (см. CACHES).
+Изменение данных записывает новую уникальную версию, и все
+закэшированное по старой версии перестает использоваться без обхода
+самих кэшей. Версия не увеличивается, а заменяется случайным значением:
+запись атомарна в любом бэкенде, поэтому одновременные изменения не
+могут получить одну и ту же версию. Вместе с версией запоминается время
+изменения для заголовка Last-Modified.
+"""
+import time
+import uuid
+
+from django.core.cache import caches
+
+CATALOG = 'catalog'
+REVIEWS = 'reviews'
+COMMENTS = 'comments'
+USERS = 'users'
+# Имена пользователей, которые выводятся в отзывах и комментариях.
+USERNAMES = 'usernames'
+
+KEY_TEMPLATE = 'version:{name}'
+MODIFIED_KEY_TEMPLATE = 'modified:{name}'
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def get_versions(*names):
+    """Возвращает кортеж текущих версий по их именам."""
+    cache = caches['versions']
+    keys = [KEY_TEMPLATE.format(name=name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # После потери ключа версия не совпадет ни с одной из уже
+            # использованных.
+            cache.add(key, new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def get_last_modified(*names):
+    """Возвращает время последнего изменения данных (timestamp).
+
+    Время хранится с долями секунды, чтобы условные запросы могли
+    отличить изменение от ответа, отданного в ту же секунду.
+    """
+    cache = caches['versions']
+    keys = [MODIFIED_KEY_TEMPLATE.format(name=name) for name in names]
+    modified = cache.get_many(keys)
+    for key in keys:
+        if key not in modified:
+            # Время изменения неизвестно: безопаснее считать, что данные
+            # изменились только что.
+            cache.add(key, time.time(), timeout=None)
+            modified[key] = cache.get(key)
+    return max(modified.values())
+
+
+def bump_version(name):
+    """Меняет версию, делая устаревшими все закэшированные данные."""
+    caches['versions'].set_many({
+        KEY_TEMPLATE.format(name=name): new_version(),
+        MODIFIED_KEY_TEMPLATE.format(name=name): time.time(),
+    }, timeout=None)
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 admin.site.register(User)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'attempts', 'next_attempt_at',
+                    'failed')
+    list_filter = ('failed',)
@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.outbox import OutboxSender, claim_emails
+
+
+class Command(BaseCommand):
+    """Отправляет письма из очереди OutgoingEmail.
+
+    Письма забираются пачками и отправляются в пуле потоков, соединения
+    с почтовым сервером переиспользуются. Без флага --once команда
+    работает постоянно и проверяет очередь раз в --poll-interval секунд.
+    Пример запуска команды:
+    python manage.py send_outbox_emails --workers 4 --batch-size 100
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить готовые письма и завершиться'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.EMAIL_OUTBOX_WORKERS,
+            help='Количество потоков отправки'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, забираемых из очереди за раз'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError(
+                'Количество потоков и размер пачки должны быть больше 0'
+            )
+        lease = timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        sender = OutboxSender(options['workers'])
+        sent = failed = 0
+        try:
+            while True:
+                emails = claim_emails(options['batch_size'], lease)
+                if emails:
+                    batch_sent, batch_failed = sender.send_batch(emails)
+                    sent += batch_sent
+                    failed += batch_failed
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sender.close()
+        self.stdout.write(
+            f'Отправлено писем: {sent}, отложено из-за ошибок: {failed}'
+        )
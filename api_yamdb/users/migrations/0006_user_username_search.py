@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:17
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalize_search_text(value):
+    # Копия api_yamdb.search_utils.normalize_search_text на момент
+    # миграции: миграция не должна зависеть от кода приложений.
+    if value is None:
+        return ''
+    return unicodedata.normalize('NFKC', value).casefold().replace('ё', 'е')
+
+
+def fill_username_search(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = list(User.objects.only('id', 'username'))
+    for user in users:
+        user.username_search = normalize_search_text(user.username)
+    User.objects.bulk_update(users, ['username_search'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_auto_20220801_1853'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='username_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=150, verbose_name='Имя пользователя для поиска'),
+        ),
+        migrations.RunPython(fill_username_search, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
+
+from api_yamdb.search_utils import normalize_search_text
 
 
 class User(AbstractUser):
@@ -21,6 +24,38 @@ class User(AbstractUser):
         choices=ROLE_CHOICES,
         default=USER,
     )
+    username_search = models.CharField(
+        'Имя пользователя для поиска',
+        max_length=150,
+        db_index=True,
+        editable=False,
+        default='',
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def remember_loaded_values(self):
+        """Запоминает имя и e-mail пользователя, сохраненные в БД.
+
+        По ним сигналы определяют, изменилось ли имя, выводимое
+        в отзывах и комментариях, и какую недавнюю регистрацию забыть.
+        """
+        self._loaded_username = self.__dict__.get('username')
+        self._loaded_email = self.__dict__.get('email')
+
+    def save(self, *args, **kwargs):
+        self.username_search = normalize_search_text(self.username)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'username' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'username_search'}
+        super().save(*args, **kwargs)
+        # После сигналов post_save, которые сравнивают новые значения
+        # с сохраненными ранее.
+        self.remember_loaded_values()
 
     @property
     def is_admin(self):
@@ -32,3 +67,45 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ('username',)
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Записывается в той же транзакции, что и изменения, о которых оно
+    сообщает, и отправляется командой send_outbox_emails. Отправленные
+    письма удаляются из очереди.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    recipient = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    failed = models.BooleanField('Не отправлено', default=False)
+    claim = models.UUIDField(
+        'Обработчик',
+        null=True,
+        blank=True,
+        db_index=True,
+    )
+
+    class Meta:
+        indexes = [
+            # Выбор писем, готовых к отправке.
+            models.Index(
+                fields=['failed', 'next_attempt_at'],
+                name='outgoing_email_pending_idx'
+            ),
+        ]
+        ordering = ('next_attempt_at', 'id')
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient}'
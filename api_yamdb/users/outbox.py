@@ -0,0 +1,153 @@
+"""Очередь исходящих писем.
+
+Письмо записывается в таблицу OutgoingEmail в той же транзакции, что и
+изменения, о которых оно сообщает, поэтому запрос не ждет SMTP-сервер,
+а письмо не теряется и не уходит при откате транзакции. Команда
+send_outbox_emails забирает письма пачками и отправляет их в пуле
+потоков, у каждого потока одно SMTP-соединение на все письма. Неудачные
+попытки повторяются с удваивающейся задержкой.
+"""
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, message, recipient):
+    """Ставит письмо в очередь."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        recipient=recipient,
+    )
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой после attempts неудачных."""
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_RETRY_DELAY,
+    ))
+
+
+def claim_emails(batch_size, lease):
+    """Забирает до batch_size писем, готовых к отправке.
+
+    Следующая попытка у забранных писем переносится на lease вперед,
+    поэтому другие обработчики не отправят их повторно, а письма
+    упавшего обработчика после этого срока снова станут доступны.
+    """
+    now = timezone.now()
+    ids = list(OutgoingEmail.objects.filter(
+        failed=False, next_attempt_at__lte=now
+    ).values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    claim = uuid.uuid4()
+    OutgoingEmail.objects.filter(
+        id__in=ids, failed=False, next_attempt_at__lte=now
+    ).update(claim=claim, next_attempt_at=now + lease)
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def record_failure(email, error):
+    """Откладывает письмо до следующей попытки или помечает неотправленным
+    после EMAIL_OUTBOX_MAX_ATTEMPTS попыток."""
+    attempts = email.attempts + 1
+    fields = {'attempts': attempts, 'last_error': error, 'claim': None}
+    if attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        fields['failed'] = True
+    else:
+        fields['next_attempt_at'] = timezone.now() + retry_delay(attempts)
+    OutgoingEmail.objects.filter(pk=email.pk, claim=email.claim).update(
+        **fields
+    )
+
+
+class OutboxSender:
+    """Отправляет письма в пуле потоков.
+
+    Соединение с почтовым сервером открывается в каждом потоке один раз
+    и используется для всех его писем; после ошибки оно закрывается,
+    и следующее письмо открывает новое.
+    """
+
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = set()
+
+    def get_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self.local.connection = connection
+            with self.lock:
+                self.connections.add(connection)
+        return connection
+
+    def reset_connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            return
+        self.local.connection = None
+        with self.lock:
+            self.connections.discard(connection)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def send(self, email):
+        """Отправляет письмо и возвращает текст ошибки или None."""
+        try:
+            EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                to=[email.recipient],
+                connection=self.get_connection(),
+            ).send()
+        except Exception as error:
+            self.reset_connection()
+            return f'{type(error).__name__}: {error}'
+        return None
+
+    def send_batch(self, emails):
+        """Отправляет письма и обновляет очередь.
+
+        Возвращает количество отправленных писем и писем с ошибками.
+        Запросы к БД выполняются только в вызывающем потоке.
+        """
+        errors = list(self.executor.map(self.send, emails))
+        sent = defaultdict(list)
+        for email, error in zip(emails, errors):
+            if error is None:
+                sent[email.claim].append(email.pk)
+        for claim, pks in sent.items():
+            # Письмо, аренду которого уже забрал другой обработчик,
+            # остается ему, как и в record_failure.
+            OutgoingEmail.objects.filter(pk__in=pks, claim=claim).delete()
+        failed = 0
+        for email, error in zip(emails, errors):
+            if error is not None:
+                record_failure(email, error)
+                failed += 1
+        return len(emails) - failed, failed
+
+    def close(self):
+        self.executor.shutdown()
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        self.connections.clear()
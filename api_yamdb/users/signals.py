@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+from .signups import forget_signup
+
+
+def loaded_signup(user):
+    return (
+        getattr(user, '_loaded_username', user.username),
+        getattr(user, '_loaded_email', user.email),
+    )
+
+
+@receiver(post_save, sender=User)
+def forget_changed_signup(sender, instance, created, **kwargs):
+    # Повтор регистрации со старыми username и email должен получить
+    # ошибку проверки, а не ответ из окна SIGNUP_RESEND_WINDOW.
+    if created:
+        return
+    username, email = loaded_signup(instance)
+    if (username, email) != (instance.username, instance.email):
+        forget_signup(username, email)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_signup(sender, instance, **kwargs):
+    forget_signup(*loaded_signup(instance))
@@ -0,0 +1,65 @@
+"""Подавление повторных регистраций.
+
+После успешной регистрации пара (username, email) запоминается в кэше
+signups на SIGNUP_RESEND_WINDOW секунд. Повторный запрос с той же парой в
+этом окне получает тот же ответ без запросов к БД и без нового письма:
+код из первого письма остается действительным. Размер кэша signups
+ограничен его MAX_ENTRIES, и вытеснение в нем не затрагивает другие
+кэши. Счетчики отправленных и подавленных писем хранятся в кэше counters
+без срока действия и суммируются по всем процессам.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_TEMPLATE = 'signup:{digest}'
+SENT_KEY = 'signup:sent'
+SUPPRESSED_KEY = 'signup:suppressed'
+
+
+def signup_key(username, email):
+    digest = hashlib.md5(f'{username}\n{email}'.encode()).hexdigest()
+    return KEY_TEMPLATE.format(digest=digest)
+
+
+def increment(key):
+    cache = caches['counters']
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Ключ вытеснен между add и incr.
+        cache.set(key, 1, timeout=None)
+
+
+def is_recent_signup(username, email):
+    """Проверяет, была ли регистрация с этой парой в окне, и учитывает
+    подавленное письмо."""
+    if not caches['signups'].get(signup_key(username, email)):
+        return False
+    increment(SUPPRESSED_KEY)
+    return True
+
+
+def remember_signup(username, email):
+    """Запоминает успешную регистрацию и учитывает отправленное письмо."""
+    caches['signups'].set(
+        signup_key(username, email), True,
+        timeout=settings.SIGNUP_RESEND_WINDOW
+    )
+    increment(SENT_KEY)
+
+
+def forget_signup(username, email):
+    """Забывает регистрацию, чтобы повтор прошел обычную проверку."""
+    caches['signups'].delete(signup_key(username, email))
+
+
+def get_signup_stats():
+    counters = caches['counters'].get_many([SENT_KEY, SUPPRESSED_KEY])
+    return {
+        'sent': counters.get(SENT_KEY, 0),
+        'suppressed': counters.get(SUPPRESSED_KEY, 0),
+        'window': settings.SIGNUP_RESEND_WINDOW,
+    }
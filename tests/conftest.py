@@ -33,4 +33,21 @@ assert get_version() < '3.0.0', 'Пожалуйста, используйте в
 
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_queries',
+    'tests.fixtures.fixture_cache',
 ]
+
+
+def pytest_configure(config):
+    """Тесты используют кэши в памяти процесса, а не файловые кэши
+    разработчика, которые очищает фикстура clear_cache."""
+    from django.conf import settings
+
+    settings.CACHES = {
+        alias: {
+            **options,
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+        for alias, options in settings.CACHES.items()
+    }
@@ -0,0 +1,54 @@
+"""Создание объектов напрямую через ORM для тестов числа запросов.
+
+В отличие от функций из common.py, которые создают фиксированный набор
+данных через API, здесь создается заданное количество объектов.
+"""
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def create_users(count, prefix='user'):
+    start = User.objects.count()
+    return [
+        User.objects.create_user(
+            username=f'{prefix}{start + i}',
+            email=f'{prefix}{start + i}@yamdb.fake'
+        )
+        for i in range(count)
+    ]
+
+
+def create_titles(count):
+    from reviews.models import Category, Genre, Title
+
+    start = Title.objects.count()
+    titles = []
+    for i in range(start, start + count):
+        category = Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}-{j}', slug=f'genre-{i}-{j}')
+            for j in range(2)
+        ]
+        title = Title.objects.create(name=f'Произведение {i}', year=2000, category=category)
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+def create_reviews(title, count):
+    from reviews.models import Review
+
+    return [
+        Review.objects.create(title=title, author=author, text='Отзыв', score=5)
+        for author in create_users(count, prefix='reviewer')
+    ]
+
+
+def create_comments(review, count):
+    from reviews.models import Comment
+
+    return [
+        Comment.objects.create(review=review, author=author, text='Комментарий')
+        for author in create_users(count, prefix='commentator')
+    ]
@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def query_budget():
+    """Проверяет, что число запросов к БД на странице постоянно.
+
+    Запросы считаются дважды: до и после вызова `fill`, который добавляет
+    объекты на страницу. Число запросов не должно меняться и не должно
+    превышать `budget`.
+    """
+
+    def count_queries(client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        return context
+
+    def check(client, url, fill, budget):
+        before = count_queries(client, url)
+        fill()
+        after = count_queries(client, url)
+        queries = '\n'.join(query['sql'] for query in after.captured_queries)
+        assert len(before) == len(after), (
+            f'Проверьте, что число запросов к БД при GET запросе `{url}` '
+            f'не зависит от количества объектов на странице: '
+            f'было {len(before)}, стало {len(after)}.\n{queries}'
+        )
+        assert len(after) <= budget, (
+            f'Проверьте, что при GET запросе `{url}` выполняется не больше '
+            f'{budget} запросов к БД, сейчас {len(after)}.\n{queries}'
+        )
+
+    return check
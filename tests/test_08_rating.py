@@ -0,0 +1,127 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются сумма и количество оценок произведения'
+        )
+        response = auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        assert response.status_code == 200
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что при изменении оценки в отзыве обновляется сумма оценок произведения'
+        )
+        response = admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        assert response.status_code == 204
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Проверьте, что при удалении отзыва обновляются сумма и количество оценок произведения'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 6
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recalculate_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        call_command('recalculate_ratings', '--check')
+        Title.objects.filter(pk=titles[0]['id']).update(rating_sum=0)
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check')
+        call_command('recalculate_ratings', '--chunk-size', '1')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что команда recalculate_ratings исправляет рейтинг'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_score_distribution(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        expected = dict.fromkeys(range(1, 11), 0)
+        expected.update({3: 1, 4: 1, 5: 1})
+        assert title.score_distribution == expected, (
+            'Проверьте, что при создании отзыва обновляется распределение оценок произведения'
+        )
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        title.refresh_from_db()
+        expected.update({3: 0, 5: 0, 9: 1})
+        assert title.score_distribution == expected, (
+            'Проверьте, что при изменении и удалении отзыва обновляется распределение оценок произведения'
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert 'score_distribution' not in admin_client.get(url).json(), (
+            'Проверьте, что поле `score_distribution` возвращается только по запросу'
+        )
+        data = admin_client.get(f'{url}?include=score_distribution').json()
+        assert data['score_distribution'] == {
+            str(score): count for score, count in expected.items()
+        }, (
+            'Проверьте, что при запросе `?include=score_distribution` возвращается распределение оценок'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_recalculate_score_distribution(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.filter(pk=titles[0]['id']).update(score_5_count=7)
+        with pytest.raises(CommandError):
+            call_command('recalculate_ratings', '--check')
+        call_command('recalculate_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.score_distribution[5] == 1, (
+            'Проверьте, что команда recalculate_ratings исправляет распределение оценок'
+        )
+        call_command('recalculate_ratings', '--check')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_stale_title_save(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[1]['id'])
+        Review.objects.create(title=title, author=admin, text='Отзыв', score=9)
+        title.description = 'Новое описание'
+        title.save()
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert title.description == 'Новое описание'
+        assert (title.rating_sum, title.rating_count, title.rating_avg) == (9, 1, 9), (
+            'Проверьте, что сохранение произведения, загруженного до создания отзыва, '
+            'не перезаписывает рейтинг'
+        )
+        assert title.score_distribution[9] == 1 and title.rating_weighted is not None, (
+            'Проверьте, что сохранение произведения не перезаписывает распределение оценок '
+            'и взвешенный рейтинг'
+        )
+        call_command('recalculate_ratings', '--check')
+        response = admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'year': 1990})
+        assert response.status_code == 200
+        assert admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/').json()['rating'] == 9, (
+            'Проверьте, что изменение произведения через API сохраняет рейтинг'
+        )
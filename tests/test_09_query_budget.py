@@ -0,0 +1,134 @@
+import pytest
+
+from .factories import create_comments, create_reviews, create_titles, create_users
+
+
+class Test09QueryBudget:
+    budgets = {
+        'users': 3,
+        'categories': 3,
+        'genres': 3,
+        'titles': 4,
+        'reviews': 4,
+        'comments': 3,
+        'recent-reviews': 3,
+        'recent-comments': 3,
+        'user-reviews': 4,
+        'user-comments': 4,
+    }
+
+    def test_01_every_endpoint_has_budget(self):
+        from api.urls import router_v1
+
+        basenames = {basename for _, _, basename in router_v1.registry}
+        assert basenames == set(self.budgets), (
+            'Проверьте, что для каждого эндпоинта из `api/urls.py` задан бюджет запросов к БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_users(self, admin_client, query_budget):
+        query_budget(admin_client, '/api/v1/users/', lambda: create_users(4), self.budgets['users'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_categories(self, admin_client, query_budget):
+        from reviews.models import Category
+
+        Category.objects.create(name='Категория 0', slug='category-0')
+
+        def fill():
+            for i in range(1, 5):
+                Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+
+        query_budget(admin_client, '/api/v1/categories/', fill, self.budgets['categories'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_genres(self, admin_client, query_budget):
+        from reviews.models import Genre
+
+        Genre.objects.create(name='Жанр 0', slug='genre-0')
+
+        def fill():
+            for i in range(1, 5):
+                Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+
+        query_budget(admin_client, '/api/v1/genres/', fill, self.budgets['genres'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_titles(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        query_budget(admin_client, '/api/v1/titles/', lambda: create_titles(4), self.budgets['titles'])
+        query_budget(
+            admin_client,
+            f'/api/v1/titles/{title.id}/',
+            lambda: title.genre.add(*create_titles(2)[0].genre.all()),
+            self.budgets['titles'],
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_reviews(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        create_reviews(title, 1)
+        query_budget(
+            admin_client,
+            f'/api/v1/titles/{title.id}/reviews/',
+            lambda: create_reviews(title, 4),
+            self.budgets['reviews'],
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_comments(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        review = create_reviews(title, 1)[0]
+        create_comments(review, 1)
+        query_budget(
+            admin_client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            lambda: create_comments(review, 4),
+            self.budgets['comments'],
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_recent_reviews(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        create_reviews(title, 1)
+        query_budget(
+            admin_client,
+            '/api/v1/reviews/recent/',
+            lambda: create_reviews(create_titles(1)[0], 4),
+            self.budgets['recent-reviews'],
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_09_recent_comments(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        create_comments(create_reviews(title, 1)[0], 1)
+        query_budget(
+            admin_client,
+            '/api/v1/comments/recent/',
+            lambda: create_comments(create_reviews(create_titles(1)[0], 1)[0], 4),
+            self.budgets['recent-comments'],
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_10_user_reviews(self, admin_client, admin, query_budget):
+        from reviews.models import Review
+
+        def fill():
+            for title in create_titles(4):
+                Review.objects.create(title=title, author=admin, text='Отзыв', score=5)
+
+        fill()
+        for url in (f'/api/v1/users/{admin.username}/reviews/', '/api/v1/users/me/reviews/'):
+            query_budget(admin_client, url, fill, self.budgets['user-reviews'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_11_user_comments(self, admin_client, admin, query_budget):
+        from reviews.models import Comment
+
+        def fill():
+            for review in create_reviews(create_titles(1)[0], 4):
+                Comment.objects.create(review=review, author=admin, text='Комментарий')
+
+        fill()
+        for url in (f'/api/v1/users/{admin.username}/comments/', '/api/v1/users/me/comments/'):
+            query_budget(admin_client, url, fill, self.budgets['user-comments'])
@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test10TitleResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_titles_list(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?year=2000&name=Поворот'
+        response = client.get(url)
+        assert response.status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get('/api/v1/titles/?name=Поворот&year=2000')
+        assert len(context) == 0, (
+            'Проверьте, что повторный GET запрос `/api/v1/titles/` '
+            'с теми же параметрами не обращается к БД'
+        )
+        assert cached.content == response.content
+
+        user, _ = create_users_api(admin_client)
+        auth_client(user).post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 8}
+        )
+        response = client.get(url)
+        assert response.json()['results'][0]['rating'] == 8, (
+            'Проверьте, что после добавления отзыва кэш `/api/v1/titles/` '
+            'не возвращает устаревший рейтинг'
+        )
+
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'year': 1999})
+        response = client.get(url)
+        assert response.json()['count'] == 0, (
+            'Проверьте, что после изменения произведения кэш `/api/v1/titles/` сбрасывается'
+        )
+
+    def test_02_lru_eviction(self):
+        from api.cache import CachedResponse, ResponseCache
+
+        cache = ResponseCache(max_bytes=10)
+        cache.set('a', CachedResponse(b'1234', 'application/json'))
+        cache.set('b', CachedResponse(b'1234', 'application/json'))
+        cache.get('a')
+        cache.set('c', CachedResponse(b'1234', 'application/json'))
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('c') is not None
+        assert cache.size == 8
+        cache.set('d', CachedResponse(b'12345678901', 'application/json'))
+        assert cache.get('d') is None
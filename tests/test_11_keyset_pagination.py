@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+
+from .common import create_reviews
+
+
+class Test11KeysetPagination:
+
+    def walk(self, client, url):
+        results = []
+        pages = 0
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+            )
+            data = response.json()
+            assert set(data) == {'next', 'results'}, (
+                'Проверьте, что при навигации по курсору возвращаются `next` и `results`'
+            )
+            results.extend(data['results'])
+            url = data['next']
+            pages += 1
+        return results, pages
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        from reviews.models import Title
+
+        names = [f'Произведение {i}' for i in (5, 3, 1, 4, 2)]
+        for name in names:
+            Title.objects.create(name=name)
+        Title.objects.create(name='Произведение 3', year=2000)
+        results, pages = self.walk(client, '/api/v1/titles/?cursor=&page_size=2')
+        assert [title['name'] for title in results] == sorted(names + ['Произведение 3']), (
+            'Проверьте, что навигация по курсору по `/api/v1/titles/` '
+            'возвращает все произведения в порядке названия без повторов'
+        )
+        assert pages == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_cursor(self, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        results, _ = self.walk(
+            admin_client,
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/?cursor=&page_size=1'
+        )
+        assert [review['id'] for review in results] == [review['id'] for review in reviews], (
+            'Проверьте, что навигация по курсору по `/api/v1/titles/{title_id}/reviews/` '
+            'возвращает отзывы в порядке публикации'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_page_size_and_invalid_cursor(self, client):
+        from django.conf import settings
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}') for i in range(settings.MAX_PAGE_SIZE + 1)
+        )
+        response = client.get('/api/v1/titles/?cursor=&page_size=1000')
+        assert len(response.json()['results']) == settings.MAX_PAGE_SIZE, (
+            'Проверьте, что размер страницы ограничен `MAX_PAGE_SIZE`'
+        )
+        response = client.get('/api/v1/titles/?page_size=10')
+        assert len(response.json()['results']) == 10
+        response = client.get('/api/v1/titles/?cursor=invalid')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('sql, index', (
+        (
+            'SELECT id FROM reviews_title WHERE name > \'a\' OR (name = \'a\' AND id > 1) '
+            'ORDER BY name, id LIMIT 10',
+            'title_name_id_idx',
+        ),
+        (
+            'SELECT id FROM reviews_review WHERE title_id = 1 '
+            'AND (pub_date > 0 OR (pub_date = 0 AND id > 1)) ORDER BY pub_date, id LIMIT 10',
+            'review_title_date_idx',
+        ),
+    ))
+    def test_04_keyset_indexes(self, sql, index):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert index in plan and 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что страницы по курсору в порядке по умолчанию сортируются по индексу `{index}`'
+        )
@@ -0,0 +1,44 @@
+import pytest
+from django.core.management import call_command
+
+
+class Test12TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_by_name_and_description(self, client, admin_client):
+        from reviews.models import Title
+
+        Title.objects.create(name='Война и мир', description='Роман-эпопея')
+        Title.objects.create(name='Мир', description='Про войну и мирную жизнь')
+        Title.objects.create(name='Идиот', description='Роман о князе')
+        response = client.get('/api/v1/titles/?search=МИР')
+        names = [title['name'] for title in response.json()['results']]
+        assert sorted(names) == ['Война и мир', 'Мир'], (
+            'Проверьте, что параметр `search` в `/api/v1/titles/` ищет по названию и описанию без учета регистра'
+        )
+        assert names[0] == 'Мир', (
+            'Проверьте, что результаты параметра `search` упорядочены по релевантности'
+        )
+        response = client.get('/api/v1/titles/?search=роман')
+        assert response.json()['count'] == 2
+
+        title = Title.objects.get(name='Идиот')
+        admin_client.patch(f'/api/v1/titles/{title.id}/', data={'name': 'Бесы'})
+        assert client.get('/api/v1/titles/?search=идиот').json()['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert client.get('/api/v1/titles/?search=бесы').json()['count'] == 0, (
+            'Проверьте, что поисковый индекс обновляется при удалении произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_command(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create([Title(name='Преступление и наказание')])
+        assert client.get('/api/v1/titles/?search=наказ').json()['count'] == 0
+        call_command('rebuild_title_search')
+        assert client.get('/api/v1/titles/?search=наказ').json()['count'] == 1, (
+            'Проверьте, что команда rebuild_title_search индексирует существующие произведения'
+        )
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+
+
+class Test13NormalizedSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cyrillic_case_insensitive(self, client, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Ёлочные сказки', slug='tales')
+        Title.objects.create(name='Поворот туда')
+        Title.objects.create(name='ПОВОРОТ обратно')
+        response = client.get('/api/v1/categories/?search=кНиг')
+        assert [category['slug'] for category in response.json()['results']] == ['books'], (
+            'Проверьте, что поиск по `/api/v1/categories/` не учитывает регистр кириллицы'
+        )
+        response = client.get('/api/v1/genres/?search=елочн')
+        assert [genre['slug'] for genre in response.json()['results']] == ['tales'], (
+            'Проверьте, что поиск по `/api/v1/genres/` приравнивает «ё» к «е»'
+        )
+        response = client.get('/api/v1/titles/?name=поворот')
+        assert response.json()['count'] == 2, (
+            'Проверьте, что фильтр `name` в `/api/v1/titles/` не учитывает регистр кириллицы'
+        )
+        Title.objects.create(name='Бойцовский клуб')
+        response = client.get('/api/v1/titles/?name=КЛУБ')
+        assert [title['name'] for title in response.json()['results']] == ['Бойцовский клуб'], (
+            'Проверьте, что фильтр `name` в `/api/v1/titles/` ищет по вхождению в название'
+        )
+        response = client.get('/api/v1/categories/?search=ниг')
+        assert [category['slug'] for category in response.json()['results']] == ['books'], (
+            'Проверьте, что поиск по `/api/v1/categories/` ищет по вхождению в название'
+        )
+        assert client.get('/api/v1/titles/?name=клуб&name_mode=prefix').json()['count'] == 0, (
+            'Проверьте, что при `name_mode=prefix` фильтр `name` ищет по началу названия'
+        )
+        assert client.get('/api/v1/titles/?name=бойц&name_mode=prefix').json()['count'] == 1
+        assert client.get('/api/v1/categories/?search=ниг&search_mode=prefix').json()['count'] == 0, (
+            'Проверьте, что при `search_mode=prefix` поиск ищет по началу названия'
+        )
+        assert client.get('/api/v1/categories/?search=кни&search_mode=prefix').json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_users_search(self, admin_client, admin):
+        from django.contrib.auth import get_user_model
+
+        get_user_model().objects.create_user(username='Пётр', email='petr@yamdb.fake')
+        response = admin_client.get('/api/v1/users/?search=петр')
+        assert [user['username'] for user in response.json()['results']] == ['Пётр']
+        response = admin_client.get('/api/v1/users/?search=TESTADM')
+        assert [user['username'] for user in response.json()['results']] == [admin.username]
+        response = admin_client.get('/api/v1/users/?search=ЁТР')
+        assert [user['username'] for user in response.json()['results']] == ['Пётр'], (
+            'Проверьте, что поиск по `/api/v1/users/` ищет по вхождению в имя пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_prefix_search_uses_index(self):
+        from reviews.models import Title
+
+        queryset = Title.objects.filter(name_search__prefix='пов')
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'name_search' in plan and 'INDEX' in plan, (
+            'Проверьте, что поиск по префиксу использует индекс по полю `name_search`'
+        )
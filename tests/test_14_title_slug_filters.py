@@ -0,0 +1,41 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test14TitleSlugFilters:
+
+    def names(self, client, url):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        return sorted(title['name'] for title in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_genre_modes(self, client, admin_client):
+        titles, _, genres = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Сборник', 'year': 2001, 'category': 'books',
+            'genre': [genres[1]['slug'], genres[2]['slug']],
+        })
+        assert self.names(client, '/api/v1/titles/?genre=comedy,drama') == [
+            'Поворот туда', 'Проект', 'Сборник'
+        ], 'Проверьте, что фильтр `genre` со списком жанров по умолчанию возвращает произведения хотя бы одного жанра'
+        assert self.names(client, '/api/v1/titles/?genre=comedy,drama&genre_mode=all') == ['Сборник'], (
+            'Проверьте, что фильтр `genre` с `genre_mode=all` возвращает произведения всех указанных жанров'
+        )
+        assert self.names(client, '/api/v1/titles/?genre=comedy,unknown&genre_mode=all') == []
+        assert self.names(client, '/api/v1/titles/?genre=com') == [], (
+            'Проверьте, что фильтр `genre` сравнивает slug жанра целиком'
+        )
+        response = client.get('/api/v1/titles/?genre=comedy&genre_mode=some')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_category(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.names(client, '/api/v1/titles/?category=films,books') == ['Поворот туда', 'Проект']
+        assert self.names(client, '/api/v1/titles/?category=film') == [], (
+            'Проверьте, что фильтр `category` сравнивает slug категории целиком'
+        )
@@ -0,0 +1,40 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test15CatalogIndex:
+
+    def test_01_bitsets(self):
+        from api.catalog_index import bitset_ids, make_bitset
+
+        ids = [0, 1, 7, 8, 64, 1000]
+        assert bitset_ids(make_bitset(ids)) == ids
+        assert bitset_ids(make_bitset([3, 9]) & make_bitset([9, 12])) == [9]
+        assert make_bitset([]) == 0 and bitset_ids(0) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_follows_catalog(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/?genre=drama&category=books&year=2020'
+        assert client.get(url).json()['count'] == 1
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'year': 2019})
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что индекс жанров и категорий перестраивается после изменения произведения'
+        )
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/?genre=horror&page_size=1')
+        assert not any('"reviews_title_genre"."genre_id" IN' in query['sql'] for query in context.captured_queries), (
+            'Проверьте, что фильтр по жанрам использует индекс в памяти, а не соединение с таблицей жанров'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_fallback_to_database(self, client, admin_client, settings):
+        create_titles(admin_client)
+        expected = client.get('/api/v1/titles/?genre=horror,drama').json()
+        settings.CATALOG_INDEX_MAX_IDS = 1
+        assert client.get('/api/v1/titles/?genre=drama,horror').json() == expected, (
+            'Проверьте, что при большой выборке фильтр по жанрам работает через БД с тем же результатом'
+        )
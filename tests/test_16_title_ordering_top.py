@@ -0,0 +1,127 @@
+import pytest
+
+from .common import auth_client, create_titles, create_users_api
+
+
+def create_rated_titles(admin_client):
+    titles, categories, genres = create_titles(admin_client)
+    response = admin_client.post('/api/v1/titles/', data={
+        'name': 'Без оценок', 'year': 1990, 'category': 'films', 'genre': ['drama']
+    })
+    titles.append({'id': response.json()['id'], 'name': 'Без оценок'})
+    user, moderator = create_users_api(admin_client)
+    for client, scores in ((auth_client(user), (4, 9)), (auth_client(moderator), (6, 7))):
+        for title, score in zip(titles, scores):
+            client.post(f'/api/v1/titles/{title["id"]}/reviews/', data={'text': 'Отзыв', 'score': score})
+    return titles, user
+
+
+class Test16TitleOrderingTop:
+
+    def names(self, response):
+        assert response.status_code == 200
+        data = response.json()
+        if isinstance(data, dict):
+            data = data['results']
+        return [title['name'] for title in data]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_ordering(self, client, admin_client):
+        create_rated_titles(admin_client)
+        assert self.names(client.get('/api/v1/titles/?ordering=-rating')) == [
+            'Проект', 'Поворот туда', 'Без оценок'
+        ], 'Проверьте, что `/api/v1/titles/?ordering=-rating` сортирует произведения по убыванию рейтинга'
+        assert self.names(client.get('/api/v1/titles/?ordering=rating')) == [
+            'Поворот туда', 'Проект', 'Без оценок'
+        ], 'Проверьте, что при сортировке `?ordering=rating` произведения без оценок выводятся последними'
+        response = client.get('/api/v1/titles/?ordering=rating&cursor=&page_size=1')
+        names = self.names(response)
+        while response.json()['next']:
+            response = client.get(response.json()['next'])
+            names += self.names(response)
+        assert names == ['Поворот туда', 'Проект', 'Без оценок'], (
+            'Проверьте, что навигация по курсору `?ordering=rating` выводит произведения без оценок последними'
+        )
+        assert self.names(client.get('/api/v1/titles/?ordering=year')) == [
+            'Без оценок', 'Поворот туда', 'Проект'
+        ]
+        assert self.names(client.get('/api/v1/titles/?ordering=-reviews_count,year')) == [
+            'Поворот туда', 'Проект', 'Без оценок'
+        ]
+        response = client.get('/api/v1/titles/?ordering=-rating&cursor=&page_size=2')
+        second = client.get(response.json()['next'])
+        assert self.names(response) + self.names(second) == ['Проект', 'Поворот туда', 'Без оценок'], (
+            'Проверьте, что навигация по курсору учитывает параметр `ordering`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_top(self, client, admin_client):
+        titles, user = create_rated_titles(admin_client)
+        assert self.names(client.get('/api/v1/titles/top/')) == ['Проект', 'Поворот туда'], (
+            'Проверьте, что `/api/v1/titles/top/` возвращает произведения с оценками по убыванию рейтинга'
+        )
+        assert self.names(client.get('/api/v1/titles/top/?category=films')) == ['Поворот туда']
+        assert self.names(client.get('/api/v1/titles/top/?genre=drama')) == ['Проект']
+        user_client = auth_client(user)
+        review = user_client.post(
+            f'/api/v1/titles/{titles[2]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 10}
+        ).json()
+        assert self.names(client.get('/api/v1/titles/top/?genre=drama')) == ['Без оценок', 'Проект'], (
+            'Проверьте, что список лучших произведений обновляется при добавлении отзыва'
+        )
+        assert self.names(client.get('/api/v1/titles/top/')) == ['Без оценок', 'Проект', 'Поворот туда']
+        user_client.delete(f'/api/v1/titles/{titles[2]["id"]}/reviews/{review["id"]}/')
+        assert self.names(client.get('/api/v1/titles/top/?genre=drama')) == ['Проект'], (
+            'Проверьте, что список лучших произведений обновляется при удалении отзыва'
+        )
+        assert self.names(client.get('/api/v1/titles/top/')) == ['Проект', 'Поворот туда']
+        assert client.get('/api/v1/titles/top/?genre=unknown').status_code == 404
+        assert client.get('/api/v1/titles/top/?genre=drama&category=films').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_weighted_rating(self, client, admin_client, settings):
+        from django.core.management import call_command
+
+        settings.RATING_PRIOR_WEIGHT = 10
+        titles, user = create_rated_titles(admin_client)
+        auth_client(user).post(f'/api/v1/titles/{titles[2]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 10})
+        assert self.names(client.get('/api/v1/titles/?ordering=-weighted_rating')) == [
+            'Проект', 'Без оценок', 'Поворот туда'
+        ], (
+            'Проверьте, что `/api/v1/titles/?ordering=-weighted_rating` сортирует произведения по взвешенному '
+            'рейтингу и одна высокая оценка не поднимает произведение выше произведений с большим числом оценок'
+        )
+        call_command('refresh_rating_prior')
+        prior = (4 + 9 + 6 + 7 + 10) / 5
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert response.json()['weighted_rating'] == pytest.approx((9 + 7 + 10 * prior) / (2 + 10)), (
+            'Проверьте, что поле `weighted_rating` сглаживает среднюю оценку к средней оценке всех произведений'
+        )
+        response = admin_client.post('/api/v1/titles/', data={'name': 'Новое', 'year': 1990, 'category': 'films'})
+        assert client.get(f'/api/v1/titles/{response.json()["id"]}/').json()['weighted_rating'] is None, (
+            'Проверьте, что у произведения без оценок поле `weighted_rating` равно None'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cursor_with_null_year(self, client):
+        from reviews.models import Title
+
+        for name, year in (('Г', None), ('А', 2000), ('В', None), ('Б', None), ('Д', 1990)):
+            Title.objects.create(name=name, year=year)
+        for ordering, expected in (
+            ('year', ['Г', 'В', 'Б', 'Д', 'А']),
+            ('-year', ['А', 'Д', 'Г', 'В', 'Б']),
+        ):
+            names = []
+            url = f'/api/v1/titles/?ordering={ordering}&cursor=&page_size=1'
+            while url:
+                response = client.get(url)
+                names += self.names(response)
+                url = response.json()['next']
+                assert len(names) <= len(expected), (
+                    f'Проверьте, что навигация по курсору `?ordering={ordering}` не зацикливается'
+                )
+            assert names == expected, (
+                f'Проверьте, что навигация по курсору `?ordering={ordering}` обходит все произведения, '
+                'в том числе без года выпуска'
+            )
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+
+from .common import auth_client, create_categories, create_reviews
+
+
+class Test17ConditionalGet:
+
+    def assert_not_modified(self, client, url, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, **headers)
+        assert response.status_code == 304, (
+            f'Проверьте, что повторный GET запрос `{url}` с условными заголовками возвращает статус 304'
+        )
+        assert len(context) == 0, (
+            f'Проверьте, что ответ 304 на GET запрос `{url}` не обращается к БД'
+        )
+        assert not response.content
+
+    def age_modified(self, name, seconds=10):
+        """Сдвигает время последнего изменения данных в прошлое."""
+        caches['versions'].set(
+            f'modified:{name}', time.time() - seconds, timeout=None
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_categories(self, client, admin_client):
+        create_categories(admin_client)
+        self.age_modified('catalog')
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert response.has_header('ETag') and response.has_header('Last-Modified'), (
+            'Проверьте, что GET запрос `/api/v1/categories/` возвращает заголовки ETag и Last-Modified'
+        )
+        etag = response['ETag']
+        self.assert_not_modified(client, '/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+        self.assert_not_modified(
+            client, '/api/v1/categories/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert client.get('/api/v1/categories/?search=Фильм', HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что ETag зависит от параметров запроса'
+        )
+        admin_client.post('/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'})
+        response = client.get('/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что после изменения категорий ETag `/api/v1/categories/` меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_titles_and_reviews(self, client, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+        )
+        etags = {}
+        for url in urls:
+            etags[url] = client.get(url)['ETag']
+            self.assert_not_modified(client, url, HTTP_IF_NONE_MATCH=etags[url])
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/', data={'score': 10}
+        )
+        for url in urls:
+            assert client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code == 200, (
+                f'Проверьте, что после изменения отзыва GET запрос `{url}` возвращает новые данные'
+            )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        etag = client.get(url)['ETag']
+        self.assert_not_modified(client, url, HTTP_IF_NONE_MATCH=etag)
+        admin_client.post(url, data={'text': 'Комментарий'})
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что после добавления комментария ETag списка комментариев меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_same_second_change(self, client, admin_client):
+        create_categories(admin_client)
+        self.age_modified('catalog')
+        last_modified = client.get('/api/v1/categories/')['Last-Modified']
+        admin_client.post('/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'})
+        response = client.get('/api/v1/categories/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения данных GET запрос с If-Modified-Since возвращает новые данные'
+        )
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдается, пока не закончилась секунда последнего изменения'
+        )
+        response = client.get(
+            '/api/v1/categories/', HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что If-Modified-Since не учитывается, пока не закончилась секунда последнего изменения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_signup_keeps_review_etags(self, client, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        client.post('/api/v1/auth/signup/', data={'username': 'newcomer', 'email': 'newcomer@yamdb.fake'})
+        self.assert_not_modified(client, url, HTTP_IF_NONE_MATCH=etag)
+        user.first_name = 'Иван'
+        user.save()
+        self.assert_not_modified(client, url, HTTP_IF_NONE_MATCH=etag)
+        user.username = 'renamed'
+        user.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что после изменения имени пользователя ETag списка отзывов меняется'
+        )
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_titles, create_users_api
+
+
+def make_titles(count, prefix='Сборник'):
+    return [
+        {'name': f'{prefix} {number}', 'year': 2001, 'category': 'books', 'genre': ['drama', 'comedy']}
+        for number in range(count)
+    ]
+
+
+class Test18TitlesBulk:
+    url = '/api/v1/titles/bulk/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create_and_update(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data = make_titles(2) + [{'id': titles[0]['id'], 'year': 1999, 'genre': ['drama']}]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{self.url}` администратора возвращает статус 201'
+        )
+        result = response.json()
+        assert [title['name'] for title in result] == ['Сборник 0', 'Сборник 1', 'Поворот туда']
+        assert result[0]['genre'] == ['drama', 'comedy'] and result[0]['category'] == 'books'
+        assert result[2]['year'] == 1999 and result[2]['category'] == 'films'
+        title = client.get(f'/api/v1/titles/{result[0]["id"]}/').json()
+        assert sorted(genre['slug'] for genre in title['genre']) == ['comedy', 'drama'], (
+            'Проверьте, что произведения создаются вместе с жанрами'
+        )
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert [genre['slug'] for genre in title['genre']] == ['drama'] and title['year'] == 1999, (
+            'Проверьте, что элементы с `id` изменяют существующие произведения'
+        )
+        assert client.get('/api/v1/titles/?search=сборник').json()['count'] == 2, (
+            'Проверьте, что созданные произведения доступны в поиске'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_queries(self, admin_client):
+        create_titles(admin_client)
+        counts = []
+        for prefix, count in (('Первый', 2), ('Второй', 20)):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(self.url, data=make_titles(count, prefix), format='json')
+            assert response.status_code == 201
+            counts.append(len(context))
+        assert counts[0] == counts[1], (
+            f'Проверьте, что число запросов к БД в `{self.url}` не зависит от количества произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_bulk_errors(self, client, admin_client):
+        create_titles(admin_client)
+        data = make_titles(1) + [
+            {'name': 'Без категории', 'genre': ['drama']},
+            {'name': 'Неизвестный жанр', 'category': 'books', 'genre': ['jazz']},
+            {'name': 'Проект', 'category': 'books', 'genre': ['drama']},
+            {'id': 100500, 'year': 2000},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что POST запрос `{self.url}` с ошибками возвращает статус 400'
+        )
+        errors = response.json()
+        assert errors[0] == {}, 'Проверьте, что ошибки возвращаются для каждого элемента в порядке запроса'
+        assert 'category' in errors[1] and 'genre' in errors[2] and 'name' in errors[3] and 'id' in errors[4]
+        assert client.get('/api/v1/titles/').json()['count'] == 2, (
+            'Проверьте, что при ошибках ни одно произведение не сохраняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_bulk_ndjson_and_permissions(self, client, admin_client):
+        create_titles(admin_client)
+        body = '\n'.join(json.dumps(title) for title in make_titles(3)) + '\n'
+        response = admin_client.post(self.url, data=body, content_type='application/x-ndjson')
+        assert response.status_code == 201 and len(response.json()) == 3, (
+            f'Проверьте, что `{self.url}` принимает произведения в формате NDJSON'
+        )
+        response = admin_client.post(self.url, data='{"name": ', content_type='application/x-ndjson')
+        assert response.status_code == 400
+        user, _ = create_users_api(admin_client)
+        assert auth_client(user).post(self.url, data=make_titles(1), format='json').status_code == 403
+        response = client.post(self.url, data=json.dumps(make_titles(1)), content_type='application/json')
+        assert response.status_code == 401
@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test19SparseFieldsets:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return response.json(), '\n'.join(query['sql'] for query in context.captured_queries)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_fields(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        data, sql = self.get(client, '/api/v1/titles/?fields=id,name,rating')
+        assert set(data['results'][0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что параметр `fields` оставляет в ответе только перечисленные поля'
+        )
+        assert 'description' not in sql and 'reviews_genre' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что при запросе `fields` из БД не загружаются ненужные колонки и связи'
+        )
+        data, sql = self.get(client, f'/api/v1/titles/{titles[0]["id"]}/?exclude=description,genre')
+        assert 'description' not in data and 'genre' not in data and data['category']['slug'], (
+            'Проверьте, что параметр `exclude` убирает перечисленные поля из ответа'
+        )
+        assert 'reviews_genre' not in sql
+        data, _ = self.get(client, f'/api/v1/titles/{titles[0]["id"]}/?fields=id,score_distribution')
+        assert set(data) == {'id', 'score_distribution'}, (
+            'Проверьте, что необязательные поля можно запросить через `fields`'
+        )
+        data, _ = self.get(client, '/api/v1/titles/?fields=id,name&ordering=-rating&cursor=')
+        assert [title['id'] for title in data['results']] == [titles[0]['id'], titles[1]['id']], (
+            'Проверьте, что `fields` работает вместе с сортировкой и курсором'
+        )
+        response = client.get('/api/v1/titles/?fields=id,unknown')
+        assert response.status_code == 400, (
+            'Проверьте, что запрос неизвестного поля в `fields` возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_other_viewsets(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        data, sql = self.get(client, f'/api/v1/titles/{titles[0]["id"]}/reviews/?fields=id,score')
+        assert set(data['results'][0]) == {'id', 'score'}
+        assert '"reviews_review"."text"' not in sql, (
+            'Проверьте, что при запросе `fields` отзывы загружаются без ненужных колонок'
+        )
+        data, _ = self.get(client, '/api/v1/categories/?fields=slug')
+        assert sorted(data['results'], key=lambda item: item['slug']) == [{'slug': 'books'}, {'slug': 'films'}]
+        data, _ = self.get(admin_client, '/api/v1/users/?exclude=bio,first_name,last_name')
+        assert set(data['results'][0]) == {'username', 'email', 'role'}
+        response = admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/?fields=id', data={'year': 1999})
+        assert response.status_code == 200 and response.json()['year'] == 1999, (
+            'Проверьте, что параметр `fields` не влияет на изменение объектов'
+        )
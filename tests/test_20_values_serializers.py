@@ -0,0 +1,56 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test20ValuesSerializers:
+
+    def content(self, client, url, settings, fast):
+        from api.views import TitleViewSet
+
+        settings.FAST_READ_SERIALIZERS = fast
+        TitleViewSet.response_cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        return response.content
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_identical_json(self, client, admin_client, admin, settings):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Без оценок', 'year': 1990, 'category': 'books', 'genre': ['drama', 'comedy']
+        })
+        admin_client.delete('/api/v1/categories/books/')
+        title_id = titles[0]['id']
+        urls = [
+            '/api/v1/categories/',
+            '/api/v1/genres/?search=д',
+            '/api/v1/titles/',
+            '/api/v1/titles/?ordering=-rating&cursor=&page_size=2',
+            '/api/v1/titles/?genre=drama,comedy&include=score_distribution',
+            '/api/v1/titles/?fields=id,weighted_rating,genre',
+            '/api/v1/titles/?search=драма',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/?cursor=&exclude=text',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/comments/',
+        ]
+        for url in urls:
+            assert self.content(client, url, settings, True) == self.content(client, url, settings, False), (
+                f'Проверьте, что быстрый сериализатор для `{url}` возвращает тот же JSON, что и обычный'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_benchmark_command(self, admin_client, admin):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        create_comments(admin_client, admin)
+        out = StringIO()
+        call_command('benchmark_serializers', '--rows', '5', '--repeat', '1', stdout=out)
+        lines = out.getvalue().splitlines()
+        assert [line.split(':')[0] for line in lines] == ['categories', 'genres', 'titles', 'reviews', 'comments'], (
+            'Проверьте, что команда benchmark_serializers выводит результат для каждого списка'
+        )
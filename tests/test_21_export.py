@@ -0,0 +1,53 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_comments
+
+
+def parse(content):
+    return [json.loads(line) for line in content.decode('utf-8').splitlines()]
+
+
+class Test21CatalogExport:
+    url = '/api/v1/export/'
+
+    def check_lines(self, lines, titles, reviews, comments):
+        assert [line['type'] for line in lines] == (
+            ['title'] * len(titles) + ['review'] * len(reviews) + ['comment'] * len(comments)
+        ), 'Проверьте, что выгрузка содержит произведения, отзывы и комментарии'
+        title = lines[0]
+        assert title['id'] == titles[0]['id'] and sorted(title['genre']) == sorted(titles[0]['genre']), (
+            'Проверьте, что в выгрузке произведения указаны его жанры'
+        )
+        assert title['category'] == titles[0]['category']
+        review = lines[len(titles)]
+        assert (review['id'], review['score'], review['title']) == (reviews[0]['id'], 5, titles[0]['id'])
+        assert lines[-1]['review'] in {review['id'] for review in reviews}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export_endpoint(self, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        response = admin_client.get(self.url)
+        assert response.status_code == 200 and response.streaming, (
+            f'Проверьте, что `{self.url}` отдает данные потоком'
+        )
+        plain = b''.join(response.streaming_content)
+        self.check_lines(parse(plain), titles, reviews, comments)
+        response = admin_client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert response['Content-Encoding'] == 'gzip', (
+            f'Проверьте, что `{self.url}` сжимает ответ, если клиент принимает gzip'
+        )
+        assert gzip.decompress(b''.join(response.streaming_content)) == plain
+        assert auth_client(user).get(self.url).status_code == 403, (
+            f'Проверьте, что `{self.url}` доступен только администратору'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_command(self, admin_client, admin, tmp_path):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        output = tmp_path / 'catalog.ndjson.gz'
+        call_command('export_catalog', '--output', str(output), '--gzip', '--chunk-size', '1')
+        self.check_lines(parse(gzip.decompress(output.read_bytes())), titles, reviews, comments)
@@ -0,0 +1,54 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test22TitleExpand:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_expand_reviews(self, client, admin_client, admin, settings):
+        settings.EXPANDED_REVIEWS_SIZE = 2
+        settings.EXPANDED_COMMENTS_SIZE = 2
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert 'reviews' not in client.get(url).json(), (
+            'Проверьте, что без параметра `expand` отзывы не встраиваются в ответ'
+        )
+        data = client.get(f'{url}?expand=reviews').json()
+        listed = client.get(f'{url}reviews/').json()['results']
+        assert data['reviews'] == listed[:2], (
+            'Проверьте, что `?expand=reviews` встраивает первые отзывы в том же виде, что и список отзывов'
+        )
+        assert 'comments' not in data['reviews'][0]
+        data = client.get(f'{url}?expand=reviews.comments').json()
+        embedded = data['reviews'][0]['comments']
+        assert [comment['id'] for comment in embedded] == [comment['id'] for comment in comments[:2]], (
+            'Проверьте, что `?expand=reviews.comments` встраивает первые комментарии каждого отзыва'
+        )
+        assert data['reviews'][1]['comments'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_expand_queries(self, client, admin_client, admin, query_budget):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        title_id = titles[1]['id']
+        admin_client.post(f'/api/v1/titles/{title_id}/reviews/', data={'text': 'Отзыв', 'score': 5})
+
+        def fill():
+            for author in (user, moderator):
+                response = auth_client(author).post(
+                    f'/api/v1/titles/{title_id}/reviews/', data={'text': 'Отзыв', 'score': 7}
+                )
+                auth_client(author).post(
+                    f'/api/v1/titles/{title_id}/reviews/{response.json()["id"]}/comments/',
+                    data={'text': 'Комментарий'}
+                )
+
+        query_budget(client, f'/api/v1/titles/{title_id}/?expand=reviews,reviews.comments', fill, 4)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_expand_errors(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        assert client.get('/api/v1/titles/?expand=reviews').status_code == 400, (
+            'Проверьте, что параметр `expand` доступен только для одного произведения'
+        )
+        assert client.get(f'/api/v1/titles/{titles[0]["id"]}/?expand=comments').status_code == 400
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client, create_titles, create_users_api
+
+
+class Test23ReviewCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_create_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        client = auth_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data={'text': 'Отзыв', 'score': 8})
+        assert response.status_code == 201
+        queries = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            index for index, sql in enumerate(queries) if sql.startswith('INSERT INTO "reviews_review"')
+        )
+        selects = [sql for sql in queries[:insert] if sql.startswith('SELECT')]
+        assert len(selects) <= 2, (
+            'Проверьте, что перед созданием отзыва выполняются только запросы пользователя и произведения:\n'
+            + '\n'.join(selects)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicate_review(self, admin_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        user, _ = create_users_api(admin_client)
+        client = auth_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client.post(url, data={'text': 'Отзыв', 'score': 8})
+        response = client.post(url, data={'text': 'Еще отзыв', 'score': 2})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение возвращает статус 400'
+        )
+        assert response.json() == {'non_field_errors': ['Нельзя оставлять больше 1 отзыва на произведение']}
+        assert Review.objects.count() == 1
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (8, 1), (
+            'Проверьте, что отклоненный повторный отзыв не меняет рейтинг произведения'
+        )
+        response = client.post('/api/v1/titles/100500/reviews/', data={'text': 'Отзыв', 'score': 8})
+        assert response.status_code == 404
@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .factories import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.parametrize('fast', (True, False))
+class Test24ReviewCommentQueries:
+    budget = 4
+
+    @pytest.fixture(autouse=True)
+    def serializers(self, settings, fast):
+        settings.FAST_READ_SERIALIZERS = fast
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_pages(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        create_reviews(title, 1)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        fill = lambda: create_reviews(title, 4)  # noqa: E731
+        query_budget(admin_client, url, fill, self.budget)
+        query_budget(admin_client, f'{url}?page=2', fill, self.budget)
+        query_budget(admin_client, f'{url}?cursor=', fill, self.budget)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comment_pages(self, admin_client, query_budget):
+        title = create_titles(1)[0]
+        review = create_reviews(title, 1)[0]
+        create_comments(review, 1)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        fill = lambda: create_comments(review, 4)  # noqa: E731
+        query_budget(admin_client, url, fill, self.budget)
+        query_budget(admin_client, f'{url}?page=2', fill, self.budget)
+        query_budget(admin_client, f'{url}?cursor=', fill, self.budget)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_author_columns(self, admin_client):
+        title = create_titles(1)[0]
+        review = create_reviews(title, 2)[0]
+        create_comments(review, 2)
+        for url in (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+            )
+            queries = '\n'.join(
+                query['sql'] for query in context.captured_queries
+                if 'FROM "reviews_' in query['sql']
+            )
+            assert 'users_user"."password' not in queries, (
+                f'Проверьте, что при GET запросе `{url}` из таблицы пользователей '
+                f'запрашивается только username автора.\n{queries}'
+            )
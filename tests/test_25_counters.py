@@ -0,0 +1,88 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .common import auth_client, create_comments
+
+
+class Test25Counters:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_counters_follow_comments(self, admin_client, admin):
+        from reviews.models import Review
+
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        review_url = f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        data = admin_client.get(review_url).json()
+        assert data['comments_count'] == 3, (
+            'Проверьте, что в отзыве выводится количество комментариев `comments_count`'
+        )
+        assert admin_client.get(f'/api/v1/titles/{title_id}/').json()['reviews_count'] == 3, (
+            'Проверьте, что в произведении выводится количество отзывов `reviews_count`'
+        )
+        response = admin_client.delete(f'{review_url}comments/{comments[0]["id"]}/')
+        assert response.status_code == 204
+        assert admin_client.get(review_url).json()['comments_count'] == 2, (
+            'Проверьте, что при удалении комментария уменьшается счетчик отзыва'
+        )
+        response = auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        assert response.status_code == 200
+        Review.objects.filter(pk=reviews[1]['id']).update(comments_count=5)
+        response = auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/', data={'text': 'Новый'}
+        )
+        assert response.status_code == 200
+        assert Review.objects.get(pk=reviews[1]['id']).comments_count == 5, (
+            'Проверьте, что изменение отзыва не перезаписывает счетчик комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cascade(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert Review.objects.get(pk=reviews[0]['id']).comments_count == 2, (
+            'Проверьте, что при удалении автора уменьшаются счетчики комментариев'
+        )
+        assert Title.objects.get(pk=titles[0]['id']).rating_count == 2, (
+            'Проверьте, что при удалении автора уменьшаются счетчики отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_ordering(self, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        for query in ('?ordering=-comments_count', '?ordering=-comments_count&cursor='):
+            response = admin_client.get(url + query)
+            ids = [review['id'] for review in response.json()['results']]
+            assert ids[0] == reviews[0]['id'], (
+                'Проверьте, что отзывы можно сортировать по `comments_count`'
+            )
+        ids = [
+            review['id']
+            for review in admin_client.get(url + '?ordering=score').json()['results']
+        ]
+        assert ids == [reviews[1]['id'], reviews[2]['id'], reviews[0]['id']], (
+            'Проверьте, что отзывы можно сортировать по `score`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_recalculate_counters_command(self, admin_client, admin):
+        from reviews.models import Review
+
+        _, reviews, _, _, _ = create_comments(admin_client, admin)
+        call_command('recalculate_counters', '--check')
+        Review.objects.update(comments_count=7)
+        with pytest.raises(CommandError):
+            call_command('recalculate_counters', '--check')
+        call_command('recalculate_counters', '--chunk-size', '1')
+        assert Review.objects.get(pk=reviews[0]['id']).comments_count == 3, (
+            'Проверьте, что команда recalculate_counters исправляет счетчики комментариев'
+        )
+        assert Review.objects.get(pk=reviews[1]['id']).comments_count == 0
+        call_command('recalculate_counters', '--check')
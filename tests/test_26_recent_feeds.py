@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .factories import create_comments, create_reviews, create_titles
+
+
+def walk(client, url):
+    """Обходит ленту по ссылкам next и возвращает все элементы."""
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        data = response.json()
+        results.extend(data['results'])
+        url = data['next']
+    return results
+
+
+class Test26RecentFeeds:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_recent_reviews(self, client):
+        titles = create_titles(2)
+        reviews = create_reviews(titles[0], 2) + create_reviews(titles[1], 3)
+        results = walk(client, '/api/v1/reviews/recent/?page_size=2')
+        assert [review['id'] for review in results] == [review.id for review in reversed(reviews)], (
+            'Проверьте, что `/api/v1/reviews/recent/` выводит отзывы ко всем произведениям '
+            'от новых к старым и переходит по страницам по курсору'
+        )
+        assert results[0] == {
+            'id': reviews[-1].id,
+            'title_id': titles[1].id,
+            'title': titles[1].name,
+            'text': 'Отзыв',
+            'author': reviews[-1].author.username,
+            'score': 5,
+            'pub_date': results[0]['pub_date'],
+            'comments_count': 0,
+        }, 'Проверьте поля отзыва в ленте последних отзывов'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_recent_comments(self, client):
+        titles = create_titles(2)
+        review = create_reviews(titles[0], 1)[0]
+        other = create_reviews(titles[1], 1)[0]
+        comments = create_comments(review, 2) + create_comments(other, 2)
+        results = walk(client, '/api/v1/comments/recent/?page_size=3')
+        assert [comment['id'] for comment in results] == [comment.id for comment in reversed(comments)], (
+            'Проверьте, что `/api/v1/comments/recent/` выводит комментарии ко всем отзывам '
+            'от новых к старым и переходит по страницам по курсору'
+        )
+        assert {key: results[0][key] for key in ('title_id', 'title', 'review_id')} == {
+            'title_id': titles[1].id, 'title': titles[1].name, 'review_id': other.id,
+        }, 'Проверьте, что в ленте комментариев выводятся отзыв и произведение'
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('url', ('/api/v1/reviews/recent/', '/api/v1/comments/recent/'))
+    def test_03_same_output(self, client, settings, url):
+        create_comments(create_reviews(create_titles(1)[0], 2)[1], 2)
+        for query in ('', '?fields=id,title,author'):
+            settings.FAST_READ_SERIALIZERS = True
+            fast = client.get(url + query).content
+            settings.FAST_READ_SERIALIZERS = False
+            with CaptureQueriesContext(connection) as context:
+                slow = client.get(url + query).content
+            assert fast == slow, (
+                f'Проверьте, что `{url}{query}` выводит одинаковые данные с быстрой '
+                f'сериализацией и без нее'
+            )
+            assert len(context) == 1, (
+                f'Проверьте, что `{url}{query}` загружает произведения и авторов '
+                f'в том же запросе, что и ленту'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('table, index', (
+        ('reviews_review', 'review_recent_idx'),
+        ('reviews_comment', 'comment_recent_idx'),
+    ))
+    def test_04_recent_index(self, table, index):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN SELECT id FROM {table} '
+                f'ORDER BY pub_date DESC, id DESC LIMIT 10'
+            )
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert index in plan, (
+            f'Проверьте, что для ленты есть индекс `{index}` по (pub_date, id)'
+        )
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+
+from .common import auth_client
+from .factories import create_comments, create_reviews, create_titles, create_users
+from .test_26_recent_feeds import walk
+
+
+class Test27UserActivity:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_user_reviews(self, client):
+        from reviews.models import Review
+
+        author, other = create_users(2)
+        titles = create_titles(3)
+        reviews = [
+            Review.objects.create(title=title, author=author, text='Отзыв', score=5)
+            for title in titles
+        ]
+        Review.objects.create(title=titles[0], author=other, text='Отзыв', score=5)
+        expected = [review.id for review in reversed(reviews)]
+        results = walk(client, f'/api/v1/users/{author.username}/reviews/?page_size=2')
+        assert [review['id'] for review in results] == expected, (
+            'Проверьте, что `/api/v1/users/{username}/reviews/` выводит только отзывы '
+            'пользователя от новых к старым и переходит по страницам по курсору'
+        )
+        results = walk(auth_client(author), '/api/v1/users/me/reviews/?page_size=2')
+        assert [review['id'] for review in results] == expected, (
+            'Проверьте, что `/api/v1/users/me/reviews/` выводит отзывы текущего пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_user_comments(self, client):
+        review = create_reviews(create_titles(1)[0], 1)[0]
+        comments = create_comments(review, 2)
+        author = comments[0].author
+        results = walk(client, f'/api/v1/users/{author.username}/comments/')
+        assert [comment['id'] for comment in results] == [comments[0].id], (
+            'Проверьте, что `/api/v1/users/{username}/comments/` выводит только '
+            'комментарии пользователя'
+        )
+        results = walk(auth_client(author), '/api/v1/users/me/comments/')
+        assert [comment['id'] for comment in results] == [comments[0].id], (
+            'Проверьте, что `/api/v1/users/me/comments/` выводит комментарии текущего пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_errors(self, client, admin_client):
+        response = client.get('/api/v1/users/me/reviews/')
+        assert response.status_code == 401, (
+            'Проверьте, что `/api/v1/users/me/reviews/` недоступен без токена'
+        )
+        response = client.get('/api/v1/users/nobody/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего пользователя возвращается статус 404'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_me_etag(self):
+        first, second = create_users(2)
+        etag = auth_client(first).get('/api/v1/users/me/reviews/')['ETag']
+        response = auth_client(second).get('/api/v1/users/me/reviews/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag `/api/v1/users/me/reviews/` зависит от пользователя'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('table, index', (
+        ('reviews_review', 'review_author_recent_idx'),
+        ('reviews_comment', 'comment_author_recent_idx'),
+    ))
+    def test_05_author_index(self, table, index):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'EXPLAIN QUERY PLAN SELECT id FROM {table} WHERE author_id = 1 '
+                f'ORDER BY pub_date DESC, id DESC LIMIT 10'
+            )
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert index in plan and 'TEMP B-TREE' not in plan, (
+            f'Проверьте, что отзывы и комментарии пользователя сортируются по индексу `{index}`'
+        )
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import auth_client
+from .factories import create_comments, create_reviews, create_titles
+
+
+def captured(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+class Test28CommentQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_single_query(self, client):
+        title = create_titles(1)[0]
+        review = create_reviews(title, 1)[0]
+        create_comments(review, 3)
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/?cursor='
+        response, queries = captured(client, 'get', url)
+        assert response.status_code == 200 and len(response.json()['results']) == 3
+        assert len(queries) == 1, (
+            'Проверьте, что список комментариев загружается одним запросом без '
+            'отдельной загрузки отзыва.\n' + '\n'.join(queries)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_empty_and_missing_review(self, client):
+        titles = create_titles(2)
+        review = create_reviews(titles[0], 1)[0]
+        url = f'/api/v1/titles/{titles[0].id}/reviews/{review.id}/comments/?cursor='
+        response, queries = captured(client, 'get', url)
+        assert response.status_code == 200 and response.json()['results'] == [], (
+            'Проверьте, что для отзыва без комментариев возвращается пустой список'
+        )
+        assert len(queries) == 2, (
+            'Проверьте, что отзыв проверяется одним запросом, только если комментариев нет'
+        )
+        for url in (
+            f'/api/v1/titles/{titles[1].id}/reviews/{review.id}/comments/',
+            f'/api/v1/titles/{titles[0].id}/reviews/{review.id + 1}/comments/',
+        ):
+            response = client.get(url)
+            assert response.status_code == 404, (
+                f'Проверьте, что при GET запросе `{url}` к несуществующему отзыву '
+                f'или отзыву другого произведения возвращается статус 404'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_create_loads_review_once(self):
+        title = create_titles(1)[0]
+        review = create_reviews(title, 1)[0]
+        user = review.author
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        response, queries = captured(auth_client(user), 'post', url, data={'text': 'Комментарий'})
+        assert response.status_code == 201
+        lookups = [sql for sql in queries if sql.startswith('SELECT') and 'FROM "reviews_review"' in sql]
+        assert len(lookups) == 1, (
+            'Проверьте, что при создании комментария отзыв загружается один раз.\n'
+            + '\n'.join(lookups)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_review_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'EXPLAIN QUERY PLAN SELECT id FROM reviews_comment WHERE review_id = 1 '
+                'AND (pub_date > 0 OR (pub_date = 0 AND id > 1)) '
+                'ORDER BY pub_date, id LIMIT 10'
+            )
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'comment_review_date_idx' in plan and 'TEMP B-TREE' not in plan, (
+            'Проверьте, что комментарии отзыва сортируются по индексу `comment_review_date_idx`'
+        )
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException('Сервер недоступен')
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class Test29EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    data = {'email': 'outbox@yamdb.fake', 'username': 'outbox'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client):
+        from users.models import OutgoingEmail
+
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письмо при регистрации не отправляется в запросе'
+        )
+        assert list(OutgoingEmail.objects.values_list('recipient', flat=True)) == [self.data['email']], (
+            'Проверьте, что при регистрации письмо записывается в очередь `OutgoingEmail`'
+        )
+        call_command('send_outbox_emails', '--once')
+        assert [message.to for message in mail.outbox] == [[self.data['email']]], (
+            'Проверьте, что команда `send_outbox_emails` отправляет письма из очереди'
+        )
+        assert not OutgoingEmail.objects.exists(), (
+            'Проверьте, что отправленные письма удаляются из очереди'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rollback(self, client, monkeypatch):
+        from api import views
+        from users.models import OutgoingEmail, User
+
+        def fail(*args, **kwargs):
+            raise RuntimeError
+
+        monkeypatch.setattr(views, 'enqueue_email', fail)
+        with pytest.raises(RuntimeError):
+            client.post(self.url_signup, data=self.data)
+        assert not User.objects.filter(username=self.data['username']).exists(), (
+            'Проверьте, что пользователь и письмо записываются в одной транзакции'
+        )
+        assert not OutgoingEmail.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_with_backoff(self, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import enqueue_email
+
+        settings.EMAIL_BACKEND = 'tests.test_29_email_outbox.FailingBackend'
+        email = enqueue_email('Тема', 'Текст', 'retry@yamdb.fake')
+        call_command('send_outbox_emails', '--once')
+        email.refresh_from_db()
+        assert email.attempts == 1 and not email.failed and 'SMTPException' in email.last_error, (
+            'Проверьте, что после ошибки отправки письмо остается в очереди для повторной попытки'
+        )
+        delay = email.next_attempt_at - timezone.now()
+        assert timedelta(0) < delay <= timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY), (
+            'Проверьте, что повторная попытка откладывается на EMAIL_OUTBOX_RETRY_DELAY'
+        )
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox_emails', '--once')
+        email.refresh_from_db()
+        assert email.attempts == 2 and email.next_attempt_at - timezone.now() > delay, (
+            'Проверьте, что задержка перед повторной попыткой растет'
+        )
+        OutgoingEmail.objects.update(
+            attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS - 1, next_attempt_at=timezone.now()
+        )
+        call_command('send_outbox_emails', '--once')
+        email.refresh_from_db()
+        assert email.failed, (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо помечается неотправленным'
+        )
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_outbox_emails', '--once')
+        assert len(mail.outbox) == 0, 'Проверьте, что неотправленные письма больше не отправляются'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_connection_reuse(self, settings):
+        from users.outbox import enqueue_email
+
+        settings.EMAIL_BACKEND = 'tests.test_29_email_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for i in range(20):
+            enqueue_email('Тема', 'Текст', f'user{i}@yamdb.fake')
+        call_command('send_outbox_emails', '--once', '--workers', '2', '--batch-size', '5')
+        assert len(mail.outbox) == 20, 'Проверьте, что отправлены все письма из очереди'
+        assert CountingBackend.opened <= 2, (
+            'Проверьте, что каждый поток открывает соединение с почтовым сервером один раз'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_reclaimed_email_kept(self, settings):
+        import uuid
+
+        from users.models import OutgoingEmail
+        from users.outbox import OutboxSender, claim_emails, enqueue_email
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        for i in range(2):
+            enqueue_email('Тема', 'Текст', f'lease{i}@yamdb.fake')
+        emails = claim_emails(10, timedelta(seconds=300))
+        # Аренда первого письма истекла, и его забрал другой обработчик.
+        OutgoingEmail.objects.filter(pk=emails[0].pk).update(claim=uuid.uuid4())
+        sender = OutboxSender(1)
+        try:
+            assert sender.send_batch(emails) == (2, 0)
+        finally:
+            sender.close()
+        assert list(OutgoingEmail.objects.values_list('pk', flat=True)) == [emails[0].pk], (
+            'Проверьте, что отправленное письмо удаляется из очереди, только если его аренда '
+            'принадлежит этому обработчику'
+        )
@@ -0,0 +1,96 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Test30SignupIdempotency:
+    url_signup = '/api/v1/auth/signup/'
+    url_stats = '/api/v1/auth/signup/stats/'
+    data = {'email': 'repeat@yamdb.fake', 'username': 'repeat'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_repeat_suppressed(self, client, admin_client):
+        from users.models import OutgoingEmail
+
+        first = client.post(self.url_signup, data=self.data)
+        with CaptureQueriesContext(connection) as context:
+            second = client.post(self.url_signup, data=self.data)
+        assert (first.status_code, second.status_code) == (200, 200)
+        assert first.json() == second.json(), (
+            'Проверьте, что повторная регистрация возвращает тот же ответ'
+        )
+        assert len(context) == 0, (
+            'Проверьте, что повторная регистрация в окне SIGNUP_RESEND_WINDOW '
+            'не обращается к БД'
+        )
+        assert OutgoingEmail.objects.count() == 1, (
+            'Проверьте, что повторная регистрация в окне SIGNUP_RESEND_WINDOW '
+            'не отправляет новое письмо'
+        )
+        response = admin_client.get(self.url_stats)
+        assert response.status_code == 200
+        assert {key: response.json()[key] for key in ('sent', 'suppressed')} == {
+            'sent': 1, 'suppressed': 1,
+        }, f'Проверьте, что `{self.url_stats}` выводит счетчики отправленных и подавленных писем'
+        assert client.get(self.url_stats).status_code == 401, (
+            f'Проверьте, что `{self.url_stats}` недоступен без токена'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_window_expired(self, client):
+        from django.core.cache import caches
+        from users.models import OutgoingEmail
+        from users.signups import signup_key
+
+        client.post(self.url_signup, data=self.data)
+        key = signup_key(self.data['username'], self.data['email'])
+        assert caches['signups'].get(key) and caches['default'].get(key) is None, (
+            'Проверьте, что недавние регистрации хранятся в отдельном кэше `signups`'
+        )
+        caches['signups'].delete(signup_key(self.data['username'], self.data['email']))
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200
+        assert OutgoingEmail.objects.count() == 2, (
+            'Проверьте, что после окна SIGNUP_RESEND_WINDOW письмо отправляется снова'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_failures_not_remembered(self, client):
+        invalid = {'email': 'invalid', 'username': 'repeat'}
+        for _ in range(2):
+            assert client.post(self.url_signup, data=invalid).status_code == 400, (
+                'Проверьте, что неудачная регистрация не запоминается'
+            )
+        client.post(self.url_signup, data=self.data)
+        other_email = {'email': 'other@yamdb.fake', 'username': self.data['username']}
+        assert client.post(self.url_signup, data=other_email).status_code == 400, (
+            'Проверьте, что повтор подавляется только для той же пары username и email'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('body', (['x'], 'x', {'username': ['x'], 'email': 'x@yamdb.fake'}))
+    def test_04_invalid_body(self, client, body):
+        response = client.post(self.url_signup, data=body, content_type='application/json')
+        assert response.status_code == 400, (
+            'Проверьте, что регистрация с телом запроса не в виде объекта со строками '
+            'возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_changed_user_forgotten(self, client, admin_client):
+        from users.models import User
+
+        client.post(self.url_signup, data=self.data)
+        user = User.objects.get(username=self.data['username'])
+        user.username = 'renamed'
+        user.save()
+        assert client.post(self.url_signup, data=self.data).status_code == 400, (
+            'Проверьте, что после изменения имени пользователя повтор регистрации '
+            'со старыми данными не подавляется'
+        )
+        client.post(self.url_signup, data={'username': 'second', 'email': 'second@yamdb.fake'})
+        User.objects.filter(username='second').delete()
+        client.post(self.url_signup, data={'username': 'second', 'email': 'second@yamdb.fake'})
+        assert User.objects.filter(username='second').exists(), (
+            'Проверьте, что после удаления пользователя повтор регистрации создает его заново'
+        )